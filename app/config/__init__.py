@@ -1,4 +1,6 @@
 import os
+from pathlib import Path
+
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,14 +10,111 @@ ADMIN_IDS = [8369302291]
 ADMIN_ID = ADMIN_IDS[0]
 CHANNEL_ID_RAW = os.getenv("CHANNEL_ID", "").strip()
 CHANNEL_ID = int(CHANNEL_ID_RAW) if CHANNEL_ID_RAW else None
+DATABASE_URL = os.getenv("DATABASE_URL", "").strip()
+
+# Сценарий черновиков проектов в БД (app/fsm/handlers.py); SQLAlchemy подключается только при включении
+ENABLE_DB_DRAFTS = os.getenv("ENABLE_DB_DRAFTS", "0").strip() == "1"
+
+# Хранилище FSM: "memory" или "sql" (таблица fsm_states в DATABASE_URL, Postgres или SQLite);
+# изменения пишутся в БД пачками не реже раза в FSM_FLUSH_INTERVAL секунд
+FSM_STORAGE = os.getenv("FSM_STORAGE", "memory").strip().lower()
+# Для memory: незаконченный сценарий удаляется после FSM_SESSION_TTL секунд без действий,
+# не больше FSM_MAX_ENTRIES записей (старые вытесняются); 0 — без ограничения
+FSM_SESSION_TTL = float(os.getenv("FSM_SESSION_TTL", "86400"))
+FSM_MAX_ENTRIES = int(os.getenv("FSM_MAX_ENTRIES", "50000"))
+FSM_FLUSH_INTERVAL = float(os.getenv("FSM_FLUSH_INTERVAL", "2"))
+FSM_FLUSH_BATCH = int(os.getenv("FSM_FLUSH_BATCH", "200"))
+FSM_CACHE_SIZE = int(os.getenv("FSM_CACHE_SIZE", "10000"))
+
+# Режим получения апдейтов: "polling" или "webhook"
+RUN_MODE = os.getenv("RUN_MODE", "polling").strip().lower()
+WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL", "").strip().rstrip("/")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook").strip()
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "").strip() or None
+WEBAPP_HOST = os.getenv("WEBAPP_HOST", "0.0.0.0").strip()
+WEBAPP_PORT = int(os.getenv("WEBAPP_PORT", "8080"))
+
+# Веб-форма калькулятора (Telegram Mini App): публичный HTTPS-адрес страницы и локальный адрес,
+# на котором её отдаёт бот (за reverse proxy). Пусто — только пошаговый сценарий в чате
+COST_FORM_URL = os.getenv("COST_FORM_URL", "").strip()
+COST_FORM_HOST = os.getenv("COST_FORM_HOST", "127.0.0.1").strip()
+COST_FORM_PORT = int(os.getenv("COST_FORM_PORT", "8082"))
+
+# Количество воркер-процессов; при WORKERS > 1 polling идёт через супервизор с шардированием по chat_id
+WORKERS = int(os.getenv("WORKERS", "1"))
+
+# Параллельная обработка: разные чаты одновременно, апдейты одного чата по очереди
+MAX_CONCURRENT_UPDATES = int(os.getenv("MAX_CONCURRENT_UPDATES", "64"))
+MAX_PENDING_UPDATES = int(os.getenv("MAX_PENDING_UPDATES", "1000"))
+# Сколько секунд при остановке ждать текущие обработчики и исходящие запросы
+SHUTDOWN_TIMEOUT = float(os.getenv("SHUTDOWN_TIMEOUT", "20"))
+# Дедлайн выполнения хендлера по умолчанию, секунды; 0 — без ограничения
+HANDLER_DEADLINE = float(os.getenv("HANDLER_DEADLINE", "30"))
+
+# Журнал обработанных update_id: продолжение с offset после рестарта без потерь и дублей
+UPDATE_LEDGER_PATH = Path(os.getenv("UPDATE_LEDGER_PATH", "data/update_ledger.log"))
+UPDATE_LEDGER_WINDOW = int(os.getenv("UPDATE_LEDGER_WINDOW", "1000"))
+DEAD_LETTER_PATH = Path(os.getenv("DEAD_LETTER_PATH", "data/dead_letters.jsonl"))
+
+# Фоновые задачи: компакция каталогов, ротация leads.txt, ежедневная сводка администраторам
+CATALOG_COMPACT_INTERVAL = float(os.getenv("CATALOG_COMPACT_INTERVAL", "3600"))
+LEADS_ROTATE_BYTES = int(os.getenv("LEADS_ROTATE_BYTES", "1000000"))
+ADMIN_DIGEST_CRON = os.getenv("ADMIN_DIGEST_CRON", "0 9 * * *").strip()
+
+# Логи пишутся через очередь в фоновом потоке; LOG_FORMAT=json — структурированные записи
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").strip().upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").strip().lower()
+LOG_FILE = os.getenv("LOG_FILE", "").strip()
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", "10000000"))
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", "5"))
+# Доля DEBUG-записей, которые попадают в лог (задержки хендлеров и т.п.)
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1"))
+
+# Сторож: задержка event loop, зависший polling, локальные /health и /ready; HEALTH_PORT=0 — без HTTP
+HEALTH_HOST = os.getenv("HEALTH_HOST", "127.0.0.1").strip()
+HEALTH_PORT = int(os.getenv("HEALTH_PORT", "8081"))
+LOOP_LAG_THRESHOLD = float(os.getenv("LOOP_LAG_THRESHOLD", "0.5"))
+POLLING_STALL_TIMEOUT = float(os.getenv("POLLING_STALL_TIMEOUT", "90"))
+WATCHDOG_RESTART_POLLING = os.getenv("WATCHDOG_RESTART_POLLING", "1").strip() == "1"
+
+# Горячий резерв: экземпляры на одном хосте делят аренду polling в SQLite; пусто — выключено.
+# Только для WORKERS=1
+STANDBY_LEASE_PATH = os.getenv("STANDBY_LEASE_PATH", "").strip()
+STANDBY_LEASE_TTL = float(os.getenv("STANDBY_LEASE_TTL", "3"))
 
 if not BOT_TOKEN:
     raise ValueError("BOT_TOKEN not found in .env file")
 
+if LOG_FORMAT not in {"text", "json"}:
+    raise ValueError(f"Unknown LOG_FORMAT: {LOG_FORMAT}")
+
+if COST_FORM_URL and not COST_FORM_URL.startswith("https://"):
+    raise ValueError("COST_FORM_URL must be an https:// URL, Telegram opens Mini Apps only over HTTPS")
+
+if FSM_STORAGE not in {"memory", "sql"}:
+    raise ValueError(f"Unknown FSM_STORAGE: {FSM_STORAGE}")
+
+if FSM_STORAGE == "sql" and not DATABASE_URL:
+    raise ValueError("DATABASE_URL is required when FSM_STORAGE=sql")
+
+if RUN_MODE not in {"polling", "webhook"}:
+    raise ValueError(f"Unknown RUN_MODE: {RUN_MODE}")
+
+if RUN_MODE == "webhook" and not WEBHOOK_BASE_URL:
+    raise ValueError("WEBHOOK_BASE_URL is required when RUN_MODE=webhook")
+
+if ENABLE_DB_DRAFTS and not DATABASE_URL:
+    raise ValueError("DATABASE_URL is required when ENABLE_DB_DRAFTS=1")
+
+# супервизор шардов опрашивает Telegram сам, без аренды и журнала update_id
+if WORKERS > 1 and STANDBY_LEASE_PATH:
+    raise ValueError("STANDBY_LEASE_PATH is not supported with WORKERS > 1")
+
 
 class _Settings:
     bot_token: str = BOT_TOKEN
     channel_id: int | None = CHANNEL_ID
+    database_url: str = DATABASE_URL
 
 
 settings = _Settings()
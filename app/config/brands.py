@@ -0,0 +1,96 @@
+import os
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.config import ADMIN_IDS, BOT_TOKEN, CHANNEL_ID, UPDATE_LEDGER_PATH, WEBHOOK_PATH, WORKERS
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_BRAND = "alpools"
+
+
+@dataclass(frozen=True, slots=True)
+class Brand:
+    name: str
+    token: str
+    admin_ids: tuple[int, ...]
+    channel_id: int | None
+    catalog_path: Path
+    ledger_path: Path
+    webhook_path: str
+
+    @property
+    def bot_id(self) -> int:
+        return int(self.token.split(":", 1)[0])
+
+    @property
+    def admin_id(self) -> int:
+        return self.admin_ids[0]
+
+    def is_admin(self, user_id: int) -> bool:
+        return user_id in self.admin_ids
+
+
+def _parse_ids(raw: str) -> tuple[int, ...]:
+    return tuple(int(item) for item in raw.replace(" ", "").split(",") if item)
+
+
+def _load_extra_brand(name: str) -> Brand:
+    prefix = name.upper()
+    token = os.getenv(f"{prefix}_BOT_TOKEN", "").strip()
+    if not token:
+        raise ValueError(f"{prefix}_BOT_TOKEN is required for brand {name}")
+
+    channel_raw = os.getenv(f"{prefix}_CHANNEL_ID", "").strip()
+    catalog_raw = os.getenv(f"{prefix}_CATALOG_PATH", "").strip()
+    return Brand(
+        name=name,
+        token=token,
+        admin_ids=_parse_ids(os.getenv(f"{prefix}_ADMIN_IDS", "")) or tuple(ADMIN_IDS),
+        channel_id=int(channel_raw) if channel_raw else None,
+        catalog_path=Path(catalog_raw) if catalog_raw else BASE_DIR / "data" / f"projects_{name}.json",
+        # update_id у каждого бота свои, поэтому и журнал отдельный
+        ledger_path=UPDATE_LEDGER_PATH.with_name(f"{UPDATE_LEDGER_PATH.stem}_{name}{UPDATE_LEDGER_PATH.suffix}"),
+        webhook_path=f"{WEBHOOK_PATH}/{name}",
+    )
+
+
+def _load_brands() -> tuple[Brand, ...]:
+    brands = [
+        Brand(
+            name=DEFAULT_BRAND,
+            token=BOT_TOKEN,
+            admin_ids=tuple(ADMIN_IDS),
+            channel_id=CHANNEL_ID,
+            catalog_path=BASE_DIR / "data" / "projects.json",
+            ledger_path=UPDATE_LEDGER_PATH,
+            webhook_path=WEBHOOK_PATH,
+        )
+    ]
+    # Дополнительные боты в том же процессе: EXTRA_BRANDS=akva, настройки из AKVA_BOT_TOKEN и т.д.
+    for name in os.getenv("EXTRA_BRANDS", "").replace(" ", "").lower().split(","):
+        if name:
+            brands.append(_load_extra_brand(name))
+
+    if len({brand.bot_id for brand in brands}) != len(brands):
+        raise ValueError("Each brand must use its own bot token")
+    if len(brands) > 1 and WORKERS > 1:
+        raise ValueError("WORKERS > 1 supports a single brand only")
+    return tuple(brands)
+
+
+BRANDS = _load_brands()
+BRANDS_BY_BOT_ID = {brand.bot_id: brand for brand in BRANDS}
+ADMIN_CHAT_IDS = frozenset(admin_id for brand in BRANDS for admin_id in brand.admin_ids)
+CHANNEL_CHAT_IDS = frozenset(brand.channel_id for brand in BRANDS if brand.channel_id is not None)
+
+# Бренд текущего апдейта; выставляется BrandMiddleware в задаче обработки
+_current_brand: ContextVar[Brand] = ContextVar("current_brand", default=BRANDS[0])
+
+
+def current_brand() -> Brand:
+    return _current_brand.get()
+
+
+def use_brand(brand: Brand) -> None:
+    _current_brand.set(brand)
@@ -22,6 +22,8 @@ class StepConfig:
     text: str
     options: list[Option] | None = None
     multi_select: bool = False
+    # вариант множественного выбора, несовместимый с остальными («Не требуется»)
+    exclusive_option: str | None = None
     validator: Validator | None = None
     comment: str | None = None
     has_engineer_button: bool = True
@@ -148,6 +150,7 @@ STEPS: list[StepConfig] = [
             Option("none", "Не требуется"),
         ],
         multi_select=True,
+        exclusive_option="none",
     ),
     StepConfig(
         key="cover",
@@ -0,0 +1,122 @@
+PROJECT_SECTIONS = {
+    "technology": {
+        "name": "Технология",
+        "price": 120_000,
+        "option_percent": 15,
+        "description": (
+            "Раздел для водоподготовки, размещения оборудования, трубопроводов "
+            "и подключения бассейна к инженерным сетям."
+        ),
+        "note": "",
+        "base_sheets": [
+            "Титульный лист",
+            "Пояснительная записка",
+            "Планы и разрезы с размещением закладных деталей системы водоподготовки бассейна",
+            "Планы и разрезы с размещением проемов под закладные детали системы водоподготовки бассейна",
+            "План размещения оборудования системы водоподготовки и аттракционов в техническом помещении бассейна",
+            "План монтажа трубопроводов системы водоподготовки и аттракционов",
+            "Принципиальная схема системы водоподготовки бассейна и аттракционов",
+            "Аксонометрическая схема системы водоподготовки бассейна и аттракционов",
+            "Строительное задание на подключение бассейна к инженерным сетям здания",
+            "Спецификация оборудования",
+        ],
+        "optional_sheets": [
+            "Визуализация бассейна и технического помещения",
+            "Дополнительные планы проемов под закладные детали",
+        ],
+    },
+    "architecture": {
+        "name": "Архитектура",
+        "price": 90_000,
+        "option_percent": 10,
+        "description": (
+            "Раздел для гидроизоляции, облицовки, узлов и архитектурных листов "
+            "по бассейну."
+        ),
+        "note": "Без финишной отделки, ее подбирает заказчик.",
+        "base_sheets": [
+            "Титульный лист",
+            "Технологическая карта гидроизоляции и облицовки",
+            "Общий план размещения бассейна",
+            "Планы и разрезы с размещением закладных деталей",
+            "Планы и разрезы с размещением проемов",
+            "Раскладка плитки + ведомость",
+            "Узлы стен, дна, переливного желоба",
+            "Спецификация материалов",
+        ],
+        "optional_sheets": [
+            "Узлы установки закладных деталей",
+        ],
+    },
+    "electric": {
+        "name": "Электрика",
+        "price": 80_000,
+        "option_percent": 12,
+        "description": (
+            "Раздел для расчета нагрузок, кабельных трасс, схем "
+            "и спецификации по электроснабжению."
+        ),
+        "note": "",
+        "base_sheets": [
+            "Титульный лист",
+            "Общие данные",
+            "Расчет нагрузок",
+            "Однолинейная схема",
+            "План оборудования и кабельных трасс",
+            "План кабельных лотков",
+            "Кабельный журнал",
+            "Схема уравнивания потенциалов",
+            "Спецификация",
+        ],
+        "optional_sheets": [
+            "Принципиальная схема шкафа",
+        ],
+    },
+    "automation": {
+        "name": "Автоматизация",
+        "price": 70_000,
+        "option_percent": 15,
+        "description": (
+            "Раздел для структурной схемы автоматизации, соединений, "
+            "кабельных трасс и спецификации."
+        ),
+        "note": "",
+        "base_sheets": [
+            "Титульный лист",
+            "Общие данные",
+            "Структурная схема автоматизации",
+            "Схема соединений",
+            "План кабельных трасс",
+            "План кабельных лотков",
+            "Спецификация",
+        ],
+        "optional_sheets": [
+            "Принципиальная схема шкафа",
+            "Компоновка шкафа",
+        ],
+    },
+    "constructive": {
+        "name": "Конструктив",
+        "price": 100_000,
+        "option_percent": 8,
+        "description": (
+            "Раздел для чертежей чаши, армирования, разрезов и "
+            "конструктивных узлов."
+        ),
+        "note": "Состав зависит от типа размещения бассейна.",
+        "base_sheets": [
+            "Титульный лист",
+            "Общие данные",
+            "План чаши",
+            "Разрезы и узлы",
+            "Планы армирования",
+            "Разрезы с армированием",
+            "Спецификация материалов",
+        ],
+        "optional_sheets": [],
+    },
+}
+
+# Значения callback_data шагов «тип бассейна» и «размещение» конфигуратора
+POOL_TYPES = ("private", "public")
+PLACEMENTS = ("indoor", "outdoor")
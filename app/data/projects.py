@@ -10,3 +10,14 @@ class ProjectCatalogItem:
     type: str
     description: str
     photos: tuple[str, ...]
+    # разобранный size в метрах; None, если размер не распознан
+    length: float | None = None
+    width: float | None = None
+    area: float | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogFacet:
+    token: str
+    label: str
+    count: int
@@ -1,6 +1,8 @@
 from pathlib import Path
 
-from aiogram.types import FSInputFile, InputMediaPhoto
+from aiogram.types import InputMediaPhoto, Message
+
+from app.services.media_registry import media_registry
 
 WELCOME_TEXT = (
     "👋 Добро пожаловать в ALpools!\n"
@@ -28,21 +30,18 @@ WELCOME_GALLERY_SOURCES: tuple[str | Path, ...] = (
 )
 
 
-def _resolve_photo_source(source: str | Path) -> str | FSInputFile:
-    if isinstance(source, Path):
-        if not source.exists():
-            raise FileNotFoundError(source)
-        return FSInputFile(source)
-    return source
-
-
-def build_welcome_media_group() -> list[InputMediaPhoto]:
+def build_welcome_media_group(bot_id: int) -> list[InputMediaPhoto]:
     media_group: list[InputMediaPhoto] = []
     for index, source in enumerate(WELCOME_GALLERY_SOURCES):
         media_group.append(
             InputMediaPhoto(
-                media=_resolve_photo_source(source),
+                media=media_registry.resolve(bot_id, source),
                 caption=WELCOME_TEXT if index == 0 else None,
             )
         )
     return media_group
+
+
+def remember_welcome_media(bot_id: int, messages: list[Message]) -> None:
+    # повторные приветствия отправляются по file_id без загрузки файлов
+    media_registry.remember_photos(bot_id, WELCOME_GALLERY_SOURCES, messages)
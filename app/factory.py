@@ -0,0 +1,307 @@
+import asyncio
+import importlib
+import logging
+from functools import partial
+from pathlib import Path
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.fsm.storage.base import BaseStorage
+
+from app.config import (
+    ADMIN_DIGEST_CRON,
+    CATALOG_COMPACT_INTERVAL,
+    COST_FORM_HOST,
+    COST_FORM_PORT,
+    COST_FORM_URL,
+    ENABLE_DB_DRAFTS,
+    FSM_CACHE_SIZE,
+    FSM_FLUSH_BATCH,
+    FSM_FLUSH_INTERVAL,
+    FSM_MAX_ENTRIES,
+    FSM_SESSION_TTL,
+    FSM_STORAGE,
+    HANDLER_DEADLINE,
+    HEALTH_HOST,
+    HEALTH_PORT,
+    LEADS_ROTATE_BYTES,
+    LOG_BACKUPS,
+    LOG_DEBUG_SAMPLE_RATE,
+    LOG_FILE,
+    LOG_FORMAT,
+    LOG_LEVEL,
+    LOG_MAX_BYTES,
+    LOOP_LAG_THRESHOLD,
+    MAX_CONCURRENT_UPDATES,
+    MAX_PENDING_UPDATES,
+    POLLING_STALL_TIMEOUT,
+    RUN_MODE,
+    SHUTDOWN_TIMEOUT,
+    STANDBY_LEASE_PATH,
+    STANDBY_LEASE_TTL,
+    UPDATE_LEDGER_WINDOW,
+    WATCHDOG_RESTART_POLLING,
+    WORKERS,
+)
+from app.config.brands import BRANDS, Brand
+from app.fsm.isolation import ChatEventIsolation
+from app.fsm.memory import BoundedMemoryStorage
+from app.middlewares.brand import BrandMiddleware
+from app.middlewares.callback_ack import CallbackAckGuard, EarlyCallbackAck
+from app.middlewares.deadline import DeadlineMiddleware
+from app.middlewares.session_expiry import SessionExpiryMiddleware
+from app.middlewares.throttling import ThrottlingMiddleware
+from app.middlewares.unit_of_work import FSMUnitOfWorkMiddleware
+from app.runtime.health import Watchdog
+from app.runtime.inflight import InFlightUpdates
+from app.runtime.jobs import JobScheduler
+from app.runtime.ledger import UpdateLedger
+from app.runtime.outbound import OutboundScheduler
+from app.utils.logging_setup import setup_logging
+from app.utils.timing import startup_timer
+
+logger = logging.getLogger(__name__)
+
+# Порядок важен: конфигураторы и каталог раньше общего меню с fallback
+ROUTER_MODULES: tuple[str, ...] = (
+    "app.handlers.dead_letters",
+    "app.handlers.project_configurator",
+    "app.handlers.projects",
+    "app.handlers.admin_projects",
+    "app.handlers.cost_handler",
+    "app.handlers.menu",
+)
+# Черновики проектов в БД: SQLAlchemy и engine грузятся только при ENABLE_DB_DRAFTS
+DB_ROUTER_MODULES: tuple[str, ...] = ("app.fsm.handlers",)
+
+
+def _load_router(module_name: str) -> Router:
+    with startup_timer.stage(f"import {module_name}"):
+        module = importlib.import_module(module_name)
+    return module.router
+
+
+async def _init_db() -> None:
+    with startup_timer.stage("import app.db.engine"):
+        from app.db.base import Base
+        from app.db.engine import engine
+
+    with startup_timer.stage("db create_all"):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+
+async def _close_db() -> None:
+    from app.db.engine import engine
+
+    await engine.dispose()
+
+
+async def _report_startup() -> None:
+    startup_timer.report()
+
+
+def create_session(scheduler: OutboundScheduler | None = None) -> AiohttpSession:
+    session = AiohttpSession()
+    session.middleware(CallbackAckGuard())
+    session.middleware(scheduler or OutboundScheduler())
+    return session
+
+
+def create_bot(brand: Brand | None = None, session: AiohttpSession | None = None) -> Bot:
+    # боты брендов делят одну сессию: общий пул соединений и планировщик исходящих запросов
+    return Bot(
+        token=(brand or BRANDS[0]).token,
+        session=session or create_session(),
+        default=DefaultBotProperties(parse_mode="HTML"),
+    )
+
+
+def create_storage() -> BaseStorage:
+    if FSM_STORAGE == "memory":
+        return BoundedMemoryStorage(ttl=FSM_SESSION_TTL, max_entries=FSM_MAX_ENTRIES)
+
+    with startup_timer.stage("import app.fsm.storage"):
+        from app.db.engine import engine
+        from app.fsm.storage import SqlStorage
+
+    return SqlStorage(
+        engine,
+        flush_interval=FSM_FLUSH_INTERVAL,
+        flush_batch=FSM_FLUSH_BATCH,
+        max_cached=FSM_CACHE_SIZE,
+    )
+
+
+def create_dispatcher() -> Dispatcher:
+    storage = create_storage()
+    dp = Dispatcher(
+        storage=storage,
+        events_isolation=ChatEventIsolation(MAX_CONCURRENT_UPDATES),
+    )
+
+    modules = ROUTER_MODULES
+    if ENABLE_DB_DRAFTS:
+        modules = DB_ROUTER_MODULES + modules
+        dp.startup.register(_init_db)
+    # диспетчер сам закрывает хранилище первым shutdown-хуком: буфер FSM сбрасывается до закрытия engine
+    if hasattr(storage, "start"):
+        dp.startup.register(storage.start)
+    if ENABLE_DB_DRAFTS or FSM_STORAGE == "sql":
+        dp.shutdown.register(_close_db)
+
+    dp.update.outer_middleware(BrandMiddleware())
+    # FSM-данные читаются и записываются один раз за апдейт, а не на каждый get_data/update_data
+    dp.update.outer_middleware(FSMUnitOfWorkMiddleware())
+    if hasattr(storage, "pop_expired"):
+        session_expiry = SessionExpiryMiddleware()
+        dp.message.outer_middleware(session_expiry)
+        dp.callback_query.outer_middleware(session_expiry)
+
+    # inner-middleware диспетчера применяются ко всем вложенным роутерам;
+    # троттлинг первым, чтобы отброшенные события не доходили до остальных
+    throttling = ThrottlingMiddleware()
+    dp.message.middleware(throttling)
+    dp.callback_query.middleware(throttling)
+    deadline = DeadlineMiddleware(HANDLER_DEADLINE)
+    dp.message.middleware(deadline)
+    dp.callback_query.middleware(deadline)
+    callback_ack = EarlyCallbackAck()
+    dp.callback_query.middleware(callback_ack)
+    # ссылки для /health: счётчики отброшенных событий, таймаутов и ранних ответов
+    dp["throttling"] = throttling
+    dp["deadline"] = deadline
+    dp["callback_ack"] = callback_ack
+
+    for module_name in modules:
+        dp.include_router(_load_router(module_name))
+
+    return dp
+
+
+def create_jobs(bots: list[Bot]) -> JobScheduler:
+    from app.handlers.dead_letters import store
+    from app.handlers.menu import LEADS_PATH
+    from app.services.chores import compact_catalogs, rotate_file, send_admin_digest
+
+    jobs = JobScheduler()
+    jobs.every(CATALOG_COMPACT_INTERVAL, "compact_catalogs", compact_catalogs, jitter=60)
+    jobs.every(600, "rotate_leads", partial(rotate_file, Path(LEADS_PATH), LEADS_ROTATE_BYTES), jitter=30)
+    jobs.every(3600, "compact_dead_letters", store.compact, jitter=60)
+    if ADMIN_DIGEST_CRON:
+        jobs.cron(ADMIN_DIGEST_CRON, "admin_digest", partial(send_admin_digest, bots, Path(LEADS_PATH), store))
+    return jobs
+
+
+async def start_cost_form():
+    # форма нужна в любом режиме запуска, где бот показывает кнопку «📝 Заполнить форму»
+    if not COST_FORM_URL:
+        return None
+    from app.runtime.cost_form import start_cost_form_server
+
+    return await start_cost_form_server(COST_FORM_HOST, COST_FORM_PORT, COST_FORM_URL)
+
+
+def register_cost_form(dp: Dispatcher) -> None:
+    # порт формы занимает только лидер: резервный экземпляр поднимет её вместе с остальными startup-хуками
+    runner = None
+
+    async def serve() -> None:
+        nonlocal runner
+        runner = await start_cost_form()
+
+    async def close() -> None:
+        nonlocal runner
+        if runner is not None:
+            await runner.cleanup()
+            runner = None
+
+    if COST_FORM_URL:
+        dp.startup.register(serve)
+        dp.shutdown.register(close)
+
+
+async def start() -> None:
+    with startup_timer.stage("create bots and dispatcher"):
+        scheduler = OutboundScheduler()
+        session = create_session(scheduler)
+        bots = [create_bot(brand, session) for brand in BRANDS]
+        dp = create_dispatcher()
+    dp.startup.register(_report_startup)
+
+    # задачи стартуют вместе с диспетчером: резервный экземпляр их не запускает, пока не получит аренду
+    jobs = create_jobs(bots)
+    dp["jobs"] = jobs
+    dp.startup.register(jobs.start)
+    dp.shutdown.register(jobs.stop)
+    register_cost_form(dp)
+
+    inflights = [
+        InFlightUpdates(
+            bot,
+            dp,
+            UpdateLedger(brand.ledger_path, window=UPDATE_LEDGER_WINDOW),
+            limit=MAX_PENDING_UPDATES,
+        )
+        for brand, bot in zip(BRANDS, bots)
+    ]
+
+    polling = None
+    if RUN_MODE == "polling":
+        from app.runtime.polling import LedgerPolling
+
+        lease = None
+        if STANDBY_LEASE_PATH:
+            from app.runtime.leader import SqliteLease
+
+            lease = SqliteLease(Path(STANDBY_LEASE_PATH), ttl=STANDBY_LEASE_TTL)
+        polling = LedgerPolling(dp, inflights, scheduler, SHUTDOWN_TIMEOUT, lease=lease)
+
+    # сторож стартует раньше polling, а /health и /ready поднимаются startup-хуком после получения аренды
+    watchdog = Watchdog(
+        dp,
+        inflights,
+        scheduler,
+        polling=polling,
+        lag_threshold=LOOP_LAG_THRESHOLD,
+        stall_timeout=POLLING_STALL_TIMEOUT,
+        restart_polling=WATCHDOG_RESTART_POLLING,
+    )
+    await watchdog.start(HEALTH_HOST, HEALTH_PORT)
+    try:
+        if polling is not None:
+            await polling.run()
+            return
+
+        with startup_timer.stage("import app.runtime.webhook"):
+            from app.runtime.webhook import run_webhook
+
+        await run_webhook(dp, inflights, scheduler, SHUTDOWN_TIMEOUT)
+    finally:
+        await watchdog.stop()
+
+
+def configure_logging() -> None:
+    setup_logging(
+        level=LOG_LEVEL,
+        fmt=LOG_FORMAT,
+        file_path=LOG_FILE,
+        max_bytes=LOG_MAX_BYTES,
+        backups=LOG_BACKUPS,
+        debug_sample_rate=LOG_DEBUG_SAMPLE_RATE,
+    )
+
+
+def run() -> None:
+    configure_logging()
+
+    if RUN_MODE == "polling" and WORKERS > 1:
+        with startup_timer.stage("import app.runtime.sharding"):
+            from app.runtime.sharding import run_supervisor
+
+        startup_timer.report()
+        run_supervisor(create_dispatcher, WORKERS)
+        return
+
+    asyncio.run(start())
@@ -0,0 +1,276 @@
+import json
+import zlib
+from collections.abc import Callable
+from typing import Any
+
+from app.config.cost_steps import STEPS
+from app.config.project_sections import PLACEMENTS, POOL_TYPES, PROJECT_SECTIONS
+
+# Компактная упаковка FSM-данных калькулятора и конфигуратора.
+# Формат: версия кодека (1 байт), отпечаток схемы (2 байта), маска полей (varint), затем поля.
+# Одиночный выбор хранится индексом варианта, множественный — битовой маской, разделы проекта —
+# индексами PROJECT_SECTIONS. Всё, что не укладывается в схему, уходит в хвост как JSON.
+CODEC_VERSION = 1
+
+_SECTION_KEYS = tuple(PROJECT_SECTIONS)
+_SECTION_SHEETS = tuple(tuple(section["optional_sheets"]) for section in PROJECT_SECTIONS.values())
+_STEP_KEYS = tuple(step.key for step in STEPS)
+_STEP_OPTIONS = tuple(tuple(option.key for option in step.options) if step.options else None for step in STEPS)
+_DESIGN_KEYS = {"section", "mode", "selected_options", "attractions_count", "lighting", "price"}
+_DESIGN_MODES = ("fast", "detailed")
+
+# при изменении вариантов шагов или листов разделов старые индексы теряют смысл
+SCHEMA_FINGERPRINT = zlib.crc32(
+    repr((_STEP_KEYS, _STEP_OPTIONS, [step.multi_select for step in STEPS], _SECTION_KEYS, _SECTION_SHEETS,
+          POOL_TYPES, PLACEMENTS)).encode()
+) & 0xFFFF
+
+
+class SchemaMismatch(ValueError):
+    pass
+
+
+class _Unfit(Exception):
+    pass
+
+
+class _Writer:
+    __slots__ = ("buffer",)
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+
+    def uint(self, value: Any) -> None:
+        if type(value) is not int or value < 0:
+            raise _Unfit
+        while value >= 0x80:
+            self.buffer.append(value & 0x7F | 0x80)
+            value >>= 7
+        self.buffer.append(value)
+
+    def text(self, value: Any) -> None:
+        if type(value) is not str:
+            raise _Unfit
+        raw = value.encode()
+        self.uint(len(raw))
+        self.buffer += raw
+
+    def index(self, value: Any, choices: tuple) -> None:
+        try:
+            self.uint(choices.index(value))
+        except ValueError:
+            raise _Unfit from None
+
+    def optional_index(self, value: Any, choices: tuple) -> None:
+        if value is None:
+            self.uint(0)
+            return
+        try:
+            self.uint(choices.index(value) + 1)
+        except ValueError:
+            raise _Unfit from None
+
+    def mask(self, values: Any, choices: tuple) -> None:
+        if not isinstance(values, list) or len(set(values)) != len(values):
+            raise _Unfit
+        mask = 0
+        for value in values:
+            try:
+                mask |= 1 << choices.index(value)
+            except ValueError:
+                raise _Unfit from None
+        self.uint(mask)
+
+    def tristate(self, value: Any) -> None:
+        if value is not None and type(value) is not bool:
+            raise _Unfit
+        self.uint(0 if value is None else 1 + value)
+
+
+class _Reader:
+    __slots__ = ("data", "offset")
+
+    def __init__(self, data: bytes, offset: int = 0) -> None:
+        self.data = data
+        self.offset = offset
+
+    def uint(self) -> int:
+        value = shift = 0
+        while True:
+            byte = self.data[self.offset]
+            self.offset += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def text(self) -> str:
+        size = self.uint()
+        raw = self.data[self.offset:self.offset + size]
+        self.offset += size
+        return raw.decode()
+
+    def optional_index(self, choices: tuple) -> Any:
+        value = self.uint()
+        return None if value == 0 else choices[value - 1]
+
+    def mask(self, choices: tuple) -> list:
+        mask = self.uint()
+        return [choice for bit, choice in enumerate(choices) if mask >> bit & 1]
+
+    def tristate(self) -> bool | None:
+        return (None, False, True)[self.uint()]
+
+
+def _write_answers(writer: _Writer, answers: Any) -> None:
+    if not isinstance(answers, dict) or not set(answers) <= set(_STEP_KEYS):
+        raise _Unfit
+    present = 0
+    for position, key in enumerate(_STEP_KEYS):
+        if key in answers:
+            present |= 1 << position
+    writer.uint(present)
+    for position, key in enumerate(_STEP_KEYS):
+        if key not in answers:
+            continue
+        options = _STEP_OPTIONS[position]
+        if options is None:
+            writer.text(answers[key])
+        elif STEPS[position].multi_select:
+            writer.mask(answers[key], options)
+        else:
+            writer.index(answers[key], options)
+
+
+def _read_answers(reader: _Reader) -> dict[str, Any]:
+    present = reader.uint()
+    answers: dict[str, Any] = {}
+    for position, key in enumerate(_STEP_KEYS):
+        if not present >> position & 1:
+            continue
+        options = _STEP_OPTIONS[position]
+        if options is None:
+            answers[key] = reader.text()
+        elif STEPS[position].multi_select:
+            answers[key] = reader.mask(options)
+        else:
+            answers[key] = options[reader.uint()]
+    return answers
+
+
+def _write_designs(writer: _Writer, designs: Any) -> None:
+    if not isinstance(designs, dict):
+        raise _Unfit
+    writer.uint(len(designs))
+    for key, design in designs.items():
+        if not isinstance(design, dict) or set(design) != _DESIGN_KEYS or design["section"] != key:
+            raise _Unfit
+        writer.index(key, _SECTION_KEYS)
+        writer.index(design["mode"], _DESIGN_MODES)
+        writer.mask(design["selected_options"], _SECTION_SHEETS[_SECTION_KEYS.index(key)])
+        writer.uint(design["attractions_count"])
+        writer.tristate(design["lighting"])
+        writer.uint(design["price"])
+
+
+def _read_designs(reader: _Reader) -> dict[str, Any]:
+    designs: dict[str, Any] = {}
+    for _ in range(reader.uint()):
+        position = reader.uint()
+        key = _SECTION_KEYS[position]
+        designs[key] = {
+            "section": key,
+            "mode": _DESIGN_MODES[reader.uint()],
+            "selected_options": reader.mask(_SECTION_SHEETS[position]),
+            "attractions_count": reader.uint(),
+            "lighting": reader.tristate(),
+            "price": reader.uint(),
+        }
+    return designs
+
+
+def _write_sections(writer: _Writer, sections: Any) -> None:
+    if not isinstance(sections, list):
+        raise _Unfit
+    writer.uint(len(sections))
+    for key in sections:
+        writer.index(key, _SECTION_KEYS)
+
+
+def _read_sections(reader: _Reader) -> list[str]:
+    return [_SECTION_KEYS[reader.uint()] for _ in range(reader.uint())]
+
+
+_Field = tuple[str, Callable[[_Writer, Any], None], Callable[[_Reader], Any]]
+
+# порядок полей — часть формата: новые поля добавляются только в конец
+_FIELDS: tuple[_Field, ...] = (
+    ("current_step_index", _Writer.uint, _Reader.uint),
+    ("answers", _write_answers, _read_answers),
+    ("designs", _write_designs, _read_designs),
+    ("sections", _write_sections, _read_sections),
+    ("current_section", lambda w, v: w.optional_index(v, _SECTION_KEYS), lambda r: r.optional_index(_SECTION_KEYS)),
+    ("attractions", _Writer.uint, _Reader.uint),
+    ("lighting", _Writer.tristate, _Reader.tristate),
+    ("total", _Writer.uint, _Reader.uint),
+    ("pool_type", lambda w, v: w.index(v, POOL_TYPES), lambda r: POOL_TYPES[r.uint()]),
+    ("placement", lambda w, v: w.index(v, PLACEMENTS), lambda r: PLACEMENTS[r.uint()]),
+)
+_REST_BIT = 1 << len(_FIELDS)
+
+
+def pack(data: dict[str, Any]) -> bytes:
+    """Упаковывает FSM-данные; TypeError, если в хвосте есть значения, несериализуемые в JSON."""
+    writer = _Writer()
+    mask = 0
+    rest = dict(data)
+    for bit, (name, write, _) in enumerate(_FIELDS):
+        if name not in rest:
+            continue
+        field = _Writer()
+        try:
+            write(field, rest[name])
+        except _Unfit:
+            continue
+        mask |= 1 << bit
+        writer.buffer += field.buffer
+        del rest[name]
+
+    if rest:
+        mask |= _REST_BIT
+        writer.text(json.dumps(rest, ensure_ascii=False, separators=(",", ":")))
+
+    header = _Writer()
+    header.buffer += bytes((CODEC_VERSION,)) + SCHEMA_FINGERPRINT.to_bytes(2, "big")
+    header.uint(mask)
+    return bytes(header.buffer + writer.buffer)
+
+
+def unpack(payload: bytes) -> dict[str, Any]:
+    version = payload[0]
+    if version != CODEC_VERSION:
+        raise SchemaMismatch(f"Unsupported FSM codec version {version}")
+    if int.from_bytes(payload[1:3], "big") != SCHEMA_FINGERPRINT:
+        raise SchemaMismatch("FSM payload was packed with a different steps/sections schema")
+
+    reader = _Reader(payload, 3)
+    mask = reader.uint()
+    data: dict[str, Any] = {}
+    for bit, (name, _, read) in enumerate(_FIELDS):
+        if mask >> bit & 1:
+            data[name] = read(reader)
+    if mask & _REST_BIT:
+        data.update(json.loads(reader.text()))
+    return data
+
+
+def pack_or_keep(data: dict[str, Any]) -> bytes | dict[str, Any]:
+    # несериализуемые данные хранятся как есть — так же, как в MemoryStorage
+    try:
+        return pack(data)
+    except TypeError:
+        return data.copy()
+
+
+def unpack_or_copy(value: bytes | dict[str, Any]) -> dict[str, Any]:
+    return unpack(value) if isinstance(value, bytes) else value.copy()
@@ -0,0 +1,80 @@
+from collections.abc import Mapping
+from copy import copy
+from typing import Any
+
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+_UNSET: Any = object()
+
+
+# FSMContext с буфером на время одного апдейта: состояние и данные читаются из хранилища
+# не больше одного раза, изменения копятся в памяти и записываются в commit() только если они были.
+# После commit() контекст пишет сразу — на случай фоновых задач, переживших апдейт.
+class BufferedFSMContext(FSMContext):
+    def __init__(self, storage: BaseStorage, key: StorageKey, raw_state: str | None = _UNSET):
+        super().__init__(storage, key)
+        self._state: str | None = raw_state
+        self._data: dict[str, Any] | None = None
+        self._state_dirty = False
+        self._data_dirty = False
+        self._committed = False
+
+    async def _load_data(self) -> dict[str, Any]:
+        if self._data is None:
+            self._data = await self.storage.get_data(key=self.key)
+        return self._data
+
+    async def _written(self) -> None:
+        if self._committed:
+            await self.commit()
+
+    async def set_state(self, state: StateType = None) -> None:
+        self._state = state.state if isinstance(state, State) else state
+        self._state_dirty = True
+        await self._written()
+
+    async def get_state(self) -> str | None:
+        if self._state is _UNSET:
+            self._state = await self.storage.get_state(key=self.key)
+        return self._state
+
+    async def set_data(self, data: Mapping[str, Any]) -> None:
+        self._data = dict(data)
+        self._data_dirty = True
+        await self._written()
+
+    async def get_data(self) -> dict[str, Any]:
+        return (await self._load_data()).copy()
+
+    async def get_value(self, key: str, default: Any | None = None) -> Any | None:
+        return copy((await self._load_data()).get(key, default))
+
+    async def update_data(self, data: Mapping[str, Any] | None = None, **kwargs: Any) -> dict[str, Any]:
+        if data:
+            kwargs.update(data)
+        current = await self._load_data()
+        current.update(kwargs)
+        self._data_dirty = True
+        await self._written()
+        return current.copy()
+
+    async def clear(self) -> None:
+        self._state = None
+        self._data = {}
+        self._state_dirty = self._data_dirty = True
+        await self._written()
+
+    @property
+    def dirty(self) -> bool:
+        return self._state_dirty or self._data_dirty
+
+    async def commit(self) -> None:
+        self._committed = True
+        if self._state_dirty:
+            self._state_dirty = False
+            await self.storage.set_state(key=self.key, state=self._state)
+        if self._data_dirty:
+            self._data_dirty = False
+            await self.storage.set_data(key=self.key, data=self._data)
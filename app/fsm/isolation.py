@@ -0,0 +1,69 @@
+import asyncio
+from collections.abc import AsyncGenerator, Hashable
+from contextlib import asynccontextmanager
+
+from aiogram.fsm.storage.base import BaseEventIsolation, StorageKey
+
+
+class _KeySlot:
+    __slots__ = ("lock", "holders")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.holders = 0
+
+
+# Апдейты одного чата выполняются строго по очереди, разные чаты — параллельно
+# в пределах общего лимита. Блокировки неактивных чатов удаляются сразу.
+class ChatEventIsolation(BaseEventIsolation):
+    def __init__(self, max_concurrency: int = 64) -> None:
+        self.max_concurrency = max_concurrency
+        self._slots: dict[Hashable, _KeySlot] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.waiting = 0
+        self.active = 0
+        self.peak_active = 0
+        self.peak_chat_depth = 0
+        self.processed = 0
+
+    @asynccontextmanager
+    async def lock(self, key: StorageKey) -> AsyncGenerator[None, None]:
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = _KeySlot()
+        slot.holders += 1
+        self.peak_chat_depth = max(self.peak_chat_depth, slot.holders)
+
+        self.waiting += 1
+        started = False
+        try:
+            async with slot.lock, self._semaphore:
+                self.waiting -= 1
+                started = True
+                self.active += 1
+                self.peak_active = max(self.peak_active, self.active)
+                try:
+                    yield
+                finally:
+                    self.active -= 1
+                    self.processed += 1
+        finally:
+            if not started:
+                self.waiting -= 1
+            slot.holders -= 1
+            if not slot.holders:
+                del self._slots[key]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "waiting": self.waiting,
+            "active": self.active,
+            "peak_active": self.peak_active,
+            "peak_chat_depth": self.peak_chat_depth,
+            "tracked_chats": len(self._slots),
+            "processed": self.processed,
+            "max_concurrency": self.max_concurrency,
+        }
+
+    async def close(self) -> None:
+        self._slots.clear()
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from copy import copy
+from typing import Any
+
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+from app.fsm.codec import pack_or_keep, unpack_or_copy
+
+SESSION_TTL = 24 * 3600
+MAX_ENTRIES = 50_000
+MAX_EXPIRED_MARKS = 10_000
+
+
+class _Entry:
+    __slots__ = ("state", "data", "size", "touched")
+
+    def __init__(self, now: float):
+        self.state: str | None = None
+        # упакованные данные; None — пустые
+        self.data: bytes | dict[str, Any] | None = None
+        self.size = 0
+        self.touched = now
+
+
+def _data_size(data: bytes | dict[str, Any] | None) -> int:
+    # упакованные данные считаются точно, неупакованные — по размеру JSON
+    if data is None:
+        return 0
+    if isinstance(data, bytes):
+        return len(data)
+    return len(json.dumps(data, default=str))
+
+
+# MemoryStorage с ограничениями: ключи без активности дольше ttl удаляются, при превышении
+# max_entries вытесняются давно не использованные. Для ключей, у которых пропал незаконченный
+# сценарий, запоминается отметка — по ней SessionExpiryMiddleware предупреждает пользователя.
+class BoundedMemoryStorage(BaseStorage):
+    def __init__(self, ttl: float = SESSION_TTL, max_entries: int = MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[StorageKey, _Entry] = OrderedDict()
+        self._expired: OrderedDict[StorageKey, str] = OrderedDict()
+        self._sweep_task: asyncio.Task | None = None
+        # суммарный размер данных ведётся при записи и удалении, а не пересчитывается на каждый /health
+        self._bytes = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    async def start(self) -> None:
+        if self.ttl and self._sweep_task is None:
+            self._sweep_task = asyncio.create_task(self._sweep_loop(), name="fsm:sweep")
+
+    def _forget(self, key: StorageKey, entry: _Entry) -> None:
+        del self._entries[key]
+        self._bytes -= entry.size
+        if entry.state is not None:
+            self._expired[key] = entry.state
+            self._expired.move_to_end(key)
+            if len(self._expired) > MAX_EXPIRED_MARKS:
+                self._expired.popitem(last=False)
+
+    def sweep(self, now: float | None = None) -> int:
+        if not self.ttl:
+            return 0
+        deadline = (now or time.monotonic()) - self.ttl
+        removed = 0
+        # записи упорядочены по последнему обращению: просроченные всегда в начале
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.touched > deadline:
+                break
+            self._forget(key, entry)
+            removed += 1
+        self.expirations += removed
+        return removed
+
+    async def _sweep_loop(self) -> None:
+        interval = min(self.ttl / 4, 60.0)
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep()
+
+    def _get(self, key: StorageKey) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if self.ttl and now - entry.touched > self.ttl:
+            self._forget(key, entry)
+            self.expirations += 1
+            return None
+        entry.touched = now
+        self._entries.move_to_end(key)
+        return entry
+
+    def _get_or_create(self, key: StorageKey) -> _Entry:
+        entry = self._get(key)
+        if entry is not None:
+            return entry
+        entry = self._entries[key] = _Entry(time.monotonic())
+        self._expired.pop(key, None)
+        if self.max_entries and len(self._entries) > self.max_entries:
+            old_key, old_entry = next(iter(self._entries.items()))
+            self._forget(old_key, old_entry)
+            self.evictions += 1
+        return entry
+
+    def _drop_if_empty(self, key: StorageKey, entry: _Entry) -> None:
+        # пустые записи не храним: после state.clear() ключ освобождается сразу
+        if entry.state is None and entry.data is None:
+            del self._entries[key]
+            self._bytes -= entry.size
+
+    def pop_expired(self, key: StorageKey) -> str | None:
+        return self._expired.pop(key, None)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        entry = self._get_or_create(key)
+        entry.state = state.state if isinstance(state, State) else state
+        self._drop_if_empty(key, entry)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        entry = self._get(key)
+        return entry.state if entry is not None else None
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            msg = f"Data must be a dict or dict-like object, got {type(data).__name__}"
+            raise DataNotDictLikeError(msg)
+        entry = self._get_or_create(key)
+        entry.data = pack_or_keep(data) if data else None
+        size = _data_size(entry.data)
+        self._bytes += size - entry.size
+        entry.size = size
+        self._drop_if_empty(key, entry)
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        entry = self._get(key)
+        if entry is None or entry.data is None:
+            return {}
+        return unpack_or_copy(entry.data)
+
+    async def get_value(self, storage_key: StorageKey, dict_key: str, default: Any | None = None) -> Any | None:
+        data = await self.get_data(storage_key)
+        return copy(data.get(dict_key, default))
+
+    async def update_data(self, key: StorageKey, data: Mapping[str, Any]) -> dict[str, Any]:
+        current = await self.get_data(key)
+        current.update(data)
+        await self.set_data(key, current)
+        return current
+
+    def data_bytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.data_bytes(),
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "expired_marks": len(self._expired),
+        }
+
+    async def close(self) -> None:
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            await asyncio.gather(self._sweep_task, return_exceptions=True)
+            self._sweep_task = None
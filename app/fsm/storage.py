@@ -0,0 +1,242 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from collections.abc import Mapping
+from copy import copy
+from typing import Any
+
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.models.fsm_state import FsmState
+from app.fsm.codec import SchemaMismatch, pack_or_keep, unpack, unpack_or_copy
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 2.0
+FLUSH_BATCH = 200
+MAX_CACHED = 10_000
+
+
+class _Record:
+    __slots__ = ("state", "data")
+
+    def __init__(self, state: str | None = None, data: bytes | dict[str, Any] | None = None):
+        self.state = state
+        # упакованные данные; None — пустые
+        self.data = data
+
+
+def _storage_key(key: StorageKey) -> str:
+    return ":".join(
+        (
+            str(key.bot_id),
+            str(key.chat_id),
+            str(key.thread_id or ""),
+            str(key.user_id),
+            key.business_connection_id or "",
+            key.destiny,
+        )
+    )
+
+
+def _upsert_statement(engine: AsyncEngine):
+    dialect = engine.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"FSM storage does not support {dialect} databases")
+
+    statement = insert(FsmState.__table__)
+    return statement.on_conflict_do_update(
+        index_elements=[FsmState.key],
+        set_={"state": statement.excluded.state, "data": statement.excluded.data, "updated_at": func.now()},
+    )
+
+
+# FSM-хранилище в БД с горячим слоем в памяти: запись читается из базы один раз,
+# дальше хендлеры работают с памятью, а изменения пачкой сбрасываются раз в flush_interval.
+# При падении процесса теряется не больше последнего интервала.
+class SqlStorage(BaseStorage):
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        flush_interval: float = FLUSH_INTERVAL,
+        flush_batch: int = FLUSH_BATCH,
+        max_cached: int = MAX_CACHED,
+    ):
+        self.engine = engine
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.max_cached = max_cached
+        self._upsert = _upsert_statement(engine)
+        self._records: OrderedDict[str, _Record] = OrderedDict()
+        self._dirty: set[str] = set()
+        # записи, которые сейчас пишутся в БД: до подтверждения записи они не считаются чистыми
+        self._flushing: set[str] = set()
+        self._loading: dict[str, asyncio.Task[_Record]] = {}
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+        self.loads = 0
+        self.flushes = 0
+        self.flushed_records = 0
+
+    async def start(self) -> None:
+        async with self.engine.begin() as conn:
+            await conn.run_sync(FsmState.__table__.create, checkfirst=True)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop(), name="fsm:flush")
+
+    async def _load(self, name: str) -> _Record:
+        self.loads += 1
+        async with self.engine.connect() as conn:
+            row = (await conn.execute(select(FsmState.state, FsmState.data).where(FsmState.key == name))).first()
+        record = _Record()
+        if row is not None:
+            try:
+                if row.data is not None:
+                    unpack(row.data)
+                record = _Record(row.state, row.data)
+            except SchemaMismatch:
+                # данные записаны до изменения шагов или разделов: сценарий начинается заново
+                logger.warning("Dropping FSM record %s packed with an outdated schema", name)
+                self._dirty.add(name)
+        record = self._records.setdefault(name, record)
+        self._evict(keep=name)
+        return record
+
+    def _evict(self, keep: str) -> None:
+        # вытесняются только давно не использованные записи, уже сохранённые в БД;
+        # только что загруженная запись сейчас получит изменения и остаётся в памяти
+        excess = len(self._records) - self.max_cached
+        if excess <= 0:
+            return
+        clean = []
+        for name in self._records:
+            if name != keep and name not in self._dirty and name not in self._flushing:
+                clean.append(name)
+                if len(clean) == excess:
+                    break
+        for name in clean:
+            del self._records[name]
+
+    async def _record(self, key: StorageKey) -> tuple[str, _Record]:
+        name = _storage_key(key)
+        record = self._records.get(name)
+        if record is not None:
+            self._records.move_to_end(name)
+            return name, record
+
+        task = self._loading.get(name)
+        if task is None:
+            task = self._loading[name] = asyncio.create_task(self._load(name))
+            task.add_done_callback(lambda _: self._loading.pop(name, None))
+        return name, await asyncio.shield(task)
+
+    def _mark_dirty(self, name: str) -> None:
+        self._dirty.add(name)
+        if len(self._dirty) >= self.flush_batch:
+            self._wakeup.set()
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        name, record = await self._record(key)
+        record.state = state.state if isinstance(state, State) else state
+        self._mark_dirty(name)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        _, record = await self._record(key)
+        return record.state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            msg = f"Data must be a dict or dict-like object, got {type(data).__name__}"
+            raise DataNotDictLikeError(msg)
+        name, record = await self._record(key)
+        record.data = pack_or_keep(data) if data else None
+        self._mark_dirty(name)
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        _, record = await self._record(key)
+        return unpack_or_copy(record.data) if record.data is not None else {}
+
+    async def get_value(self, storage_key: StorageKey, dict_key: str, default: Any | None = None) -> Any | None:
+        data = await self.get_data(storage_key)
+        return copy(data.get(dict_key, default))
+
+    async def update_data(self, key: StorageKey, data: Mapping[str, Any]) -> dict[str, Any]:
+        current = await self.get_data(key)
+        current.update(data)
+        await self.set_data(key, current)
+        return current
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._dirty:
+                return 0
+            names, self._dirty = self._dirty, set()
+            self._flushing = names
+
+            # данные хранятся упакованными, поэтому снимок — это просто ссылки на bytes
+            upserts: list[dict[str, Any]] = []
+            deletes: list[str] = []
+            for name in names:
+                record = self._records.get(name)
+                if record is None:
+                    continue
+                if record.state is None and record.data is None:
+                    deletes.append(name)
+                    continue
+                if isinstance(record.data, dict):
+                    logger.error("FSM data for %s is not JSON serializable, record is not persisted", name)
+                    continue
+                upserts.append({"key": name, "state": record.state, "data": record.data})
+
+            try:
+                async with self.engine.begin() as conn:
+                    if upserts:
+                        await conn.execute(self._upsert, upserts)
+                    if deletes:
+                        await conn.execute(delete(FsmState).where(FsmState.key.in_(deletes)))
+            except BaseException:
+                self._dirty |= names
+                raise
+            finally:
+                self._flushing = set()
+
+            self.flushes += 1
+            self.flushed_records += len(upserts) + len(deletes)
+            return len(upserts) + len(deletes)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("FSM flush failed, %s records will be retried", len(self._dirty))
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "cached": len(self._records),
+            "dirty": len(self._dirty),
+            "loads": self.loads,
+            "flushes": self.flushes,
+            "flushed_records": self.flushed_records,
+        }
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await self.flush()
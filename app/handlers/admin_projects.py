@@ -6,7 +6,7 @@ from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, InputMediaPhoto, Message, ReplyKeyboardRemove
 
-from app.config import ADMIN_IDS, CHANNEL_ID
+from app.config.brands import current_brand
 from app.keyboards.admin_kb import (
     admin_menu_kb,
     confirm_kb,
@@ -22,6 +22,7 @@ from app.services.projects_service import (
     delete_project,
     get_all_projects,
     get_project_by_id,
+    parse_project_size,
     update_project,
 )
 from app.states.admin_states import AdminAddProject, AdminEditProject
@@ -53,6 +54,10 @@ EDITABLE_FIELDS = {
     BTN_TYPE: ("type", AdminEditProject.waiting_type, "Выберите новый тип бассейна"),
     BTN_DESCRIPTION: ("description", AdminEditProject.waiting_description, "Введите новое описание проекта"),
 }
+SIZE_NOT_PARSED_TEXT = (
+    "⚠️ Размер не распознан как «длина x ширина», проект не попадёт в фильтр по размеру. "
+    "Чтобы исправить, измените размер, например: 8x4."
+)
 PHOTO_ACTIONS = {
     BTN_REPLACE_PHOTOS: "replace",
     BTN_ADD_NEW_PHOTOS: "append",
@@ -60,7 +65,7 @@ PHOTO_ACTIONS = {
 
 
 def _is_admin(user_id: int) -> bool:
-    return user_id in ADMIN_IDS
+    return current_brand().is_admin(user_id)
 
 
 async def _deny_message(message: Message) -> None:
@@ -154,7 +159,8 @@ async def _publish_project(message: Message, project_id: str | int) -> str:
     if project is None:
         return "Проект не найден."
 
-    if CHANNEL_ID is None:
+    channel_id = current_brand().channel_id
+    if channel_id is None:
         return "Публикация пропущена: `CHANNEL_ID` не задан."
 
     text = _build_publish_text(project_id)
@@ -168,11 +174,15 @@ async def _publish_project(message: Message, project_id: str | int) -> str:
                 )
             ]
             media.extend(InputMediaPhoto(media=file_id) for file_id in project.photos[1:])
-            await message.bot.send_media_group(chat_id=CHANNEL_ID, media=media)
+            await message.bot.send_media_group(chat_id=channel_id, media=media)
         else:
-            await message.bot.send_message(chat_id=CHANNEL_ID, text=text)
+            await message.bot.send_message(chat_id=channel_id, text=text)
     except Exception as exc:
-        logger.exception("Не удалось опубликовать проект %s в канал", project_id)
+        logger.exception(
+            "Не удалось опубликовать проект %s в канал",
+            project_id,
+            extra={"chat_id": channel_id, "handler": "publish_project"},
+        )
         return f"Публикация не выполнена: {exc.__class__.__name__}."
 
     return "Проект опубликован в канал."
@@ -312,7 +322,7 @@ async def cancel_delete_project(callback: CallbackQuery) -> None:
     await callback.message.answer("Удаление отменено.", reply_markup=admin_menu_kb())
 
 
-@router.callback_query(F.data.startswith("publish_project_"))
+@router.callback_query(F.data.startswith("publish_project_"), flags={"deadline": 120, "early_ack": True})
 async def publish_project(callback: CallbackQuery) -> None:
     if not callback.from_user or not _is_admin(callback.from_user.id):
         await _deny_callback(callback)
@@ -362,8 +372,11 @@ async def process_project_size(message: Message, state: FSMContext) -> None:
         await message.answer("Размер не может быть пустым. Введите размер.")
         return
 
-    await state.update_data(size=message.text.strip())
+    size = message.text.strip()
+    await state.update_data(size=size)
     await state.set_state(AdminAddProject.waiting_type)
+    if parse_project_size(size) is None:
+        await message.answer(SIZE_NOT_PARSED_TEXT)
     await message.answer("Выберите тип бассейна", reply_markup=project_type_kb())
 
 
@@ -413,7 +426,7 @@ async def ignore_non_photo_input(message: Message) -> None:
     await message.answer("На этом шаге отправьте фото или нажмите «Готово».")
 
 
-@router.message(AdminAddProject.waiting_confirmation, F.text == BTN_SAVE)
+@router.message(AdminAddProject.waiting_confirmation, F.text == BTN_SAVE, flags={"deadline": 120})
 async def save_project(message: Message, state: FSMContext) -> None:
     data = await state.get_data()
     project = add_project(
@@ -489,7 +502,10 @@ async def edit_project_size(message: Message, state: FSMContext) -> None:
         await message.answer("Размер не может быть пустым. Введите новый размер.")
         return
 
-    await _save_text_field(message, state, "size", message.text.strip(), "Размер обновлён. Что изменить дальше?")
+    size = message.text.strip()
+    if parse_project_size(size) is None:
+        await message.answer(SIZE_NOT_PARSED_TEXT)
+    await _save_text_field(message, state, "size", size, "Размер обновлён. Что изменить дальше?")
 
 
 @router.message(AdminEditProject.waiting_type)
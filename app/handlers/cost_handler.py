@@ -4,28 +4,40 @@ from typing import Any
 from aiogram import F, Router
 from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
-from aiogram.types import CallbackQuery, Message
+from aiogram.types import CallbackQuery, KeyboardButton, Message, ReplyKeyboardMarkup, WebAppInfo
 
-from app.config import ADMIN_ID
+from app.config import COST_FORM_URL
+from app.config.brands import current_brand
 from app.config.cost_steps import STEPS, StepConfig
-from app.handlers.menu import BTN_INDIVIDUAL_CALC
+from app.handlers.menu import BTN_INDIVIDUAL_CALC, get_main_menu_keyboard
 from app.keyboards.cost_kb import (
     CB_BACK,
     CB_CANCEL,
-    CB_CLEAR,
+    CB_DONE,
     CB_ENGINEER,
-    CB_NEXT,
     CB_PREFIX,
     CB_SELECT,
+    CB_TOGGLE,
     build_step_keyboard,
+    parse_selection_callback,
 )
+from app.services.cost_form import parse_cost_form
 from app.services.cost_service import build_cost_payload
 from app.services.tz_formatter import format_tz_text
+from app.utils.selection import from_mask
 
 router = Router()
 logger = logging.getLogger(__name__)
 
 COST_STATES = [step.state for step in STEPS]
+BTN_COST_FORM = "📝 Заполнить форму"
+
+
+def _cost_form_keyboard() -> ReplyKeyboardMarkup:
+    return ReplyKeyboardMarkup(
+        keyboard=[[KeyboardButton(text=BTN_COST_FORM, web_app=WebAppInfo(url=COST_FORM_URL))]],
+        resize_keyboard=True,
+    )
 
 
 @router.message(F.text == BTN_INDIVIDUAL_CALC)
@@ -34,10 +46,32 @@ async def start_cost_estimator(message: Message, state: FSMContext) -> None:
     await state.set_state(STEPS[0].state)
     await state.update_data(current_step_index=0, answers={})
 
-    logger.info("Cost configurator started by user_id=%s", message.from_user.id if message.from_user else "unknown")
+    user_id = message.from_user.id if message.from_user else None
+    logger.info("Cost configurator started", extra={"user_id": user_id, "step": STEPS[0].key})
+    if COST_FORM_URL:
+        # все ответы одной формой вместо 20 сообщений; пошаговый сценарий ниже остаётся запасным
+        await message.answer(
+            "Ответить на все вопросы можно сразу в форме — кнопка «📝 Заполнить форму» внизу. "
+            "Или продолжайте здесь по шагам.",
+            reply_markup=_cost_form_keyboard(),
+        )
     await _show_step(message, STEPS[0], state)
 
 
+@router.message(F.web_app_data)
+async def process_cost_form(message: Message, state: FSMContext) -> None:
+    answers, errors = parse_cost_form(message.web_app_data.data)
+    user_id = message.from_user.id if message.from_user else None
+    if errors:
+        logger.warning("Cost form rejected", extra={"user_id": user_id})
+        await message.answer("Проверьте ответы в форме:\n" + "\n".join(f"• {error}" for error in errors))
+        return
+
+    logger.info("Cost form submitted", extra={"user_id": user_id})
+    await state.clear()
+    await _send_result(message, answers)
+
+
 @router.message(StateFilter(*COST_STATES), F.text)
 async def process_text_step(message: Message, state: FSMContext) -> None:
     idx, answers = await _load_progress(state)
@@ -52,7 +86,8 @@ async def process_text_step(message: Message, state: FSMContext) -> None:
     if step.validator:
         is_valid, error = step.validator(value)
         if not is_valid:
-            logger.warning("Validation error for step=%s user_id=%s", step.key, message.from_user.id if message.from_user else "unknown")
+            user_id = message.from_user.id if message.from_user else None
+            logger.warning("Validation error", extra={"user_id": user_id, "step": step.key})
             await message.answer(error or "Некорректное значение. Попробуйте еще раз.")
             return
 
@@ -61,6 +96,43 @@ async def process_text_step(message: Message, state: FSMContext) -> None:
     await _go_next(message, state, idx)
 
 
+STALE_KEYBOARD_TEXT = "Эти кнопки устарели. Продолжите с последнего шага."
+
+
+@router.callback_query(StateFilter(*COST_STATES), F.data.startswith(f"{CB_TOGGLE}:"))
+async def toggle_multi_select(callback: CallbackQuery) -> None:
+    # выбор хранится в самой клавиатуре: хранилище не читается и не пишется до «Готово»
+    parsed = parse_selection_callback(callback.data, masks_count=2)
+    if parsed is None or not callback.message:
+        await callback.answer(STALE_KEYBOARD_TEXT)
+        return
+
+    step, (mask, new_mask) = parsed
+    if new_mask != mask:
+        options = [option.key for option in step.options]
+        await callback.message.edit_reply_markup(reply_markup=build_step_keyboard(step, from_mask(new_mask, options)))
+    await callback.answer("Выбор очищен" if not new_mask and mask else None)
+
+
+@router.callback_query(StateFilter(*COST_STATES), F.data.startswith(f"{CB_DONE}:"))
+async def finish_multi_select(callback: CallbackQuery, state: FSMContext, raw_state: str | None) -> None:
+    parsed = parse_selection_callback(callback.data, masks_count=1)
+    if parsed is None or not callback.message or parsed[0].state.state != raw_state:
+        await callback.answer(STALE_KEYBOARD_TEXT)
+        return
+
+    step, (mask,) = parsed
+    if not mask:
+        await callback.answer("Выберите хотя бы один вариант.", show_alert=True)
+        return
+
+    idx, answers = await _load_progress(state)
+    answers[step.key] = from_mask(mask, [option.key for option in step.options])
+    await state.update_data(answers=answers)
+    await callback.answer()
+    await _go_next(callback.message, state, idx)
+
+
 @router.callback_query(StateFilter(*COST_STATES), F.data.startswith(f"{CB_PREFIX}:"))
 async def process_step_callback(callback: CallbackQuery, state: FSMContext) -> None:
     if not callback.data or not callback.message:
@@ -73,7 +145,10 @@ async def process_step_callback(callback: CallbackQuery, state: FSMContext) -> N
 
     if data == CB_CANCEL:
         await state.clear()
-        await callback.message.answer("Конфигуратор отменен. Вы можете начать заново из меню.")
+        await callback.message.answer(
+            "Конфигуратор отменен. Вы можете начать заново из меню.",
+            reply_markup=get_main_menu_keyboard(),
+        )
         await callback.answer()
         return
 
@@ -90,11 +165,11 @@ async def process_step_callback(callback: CallbackQuery, state: FSMContext) -> N
 
     if data == CB_ENGINEER:
         user = callback.from_user
-        logger.info("Engineer consultation requested in configurator by user_id=%s", user.id)
+        logger.info("Engineer consultation requested in configurator", extra={"user_id": user.id})
         await callback.message.answer("Запрос отправлен. Инженер свяжется с вами в ближайшее время.")
         username = f"@{user.username}" if user.username else "не указан"
         await callback.bot.send_message(
-            ADMIN_ID,
+            current_brand().admin_id,
             (
                 "👨‍🔧 Запрос консультации инженера из конфигуратора\n"
                 f"ID: {user.id}\n"
@@ -105,54 +180,13 @@ async def process_step_callback(callback: CallbackQuery, state: FSMContext) -> N
         await callback.answer()
         return
 
-    if data == CB_CLEAR and step.multi_select:
-        answers[step.key] = []
-        await state.update_data(answers=answers)
-        await callback.message.edit_reply_markup(reply_markup=build_step_keyboard(step, []))
-        await callback.answer("Выбор очищен")
-        return
-
-    if data.startswith(f"{CB_SELECT}:") and step.options:
-        selected_key = data.split(":")[-1]
-        if step.multi_select:
-            selected = list(answers.get(step.key, []))
-            
-            if step.key == "attractions":
-                none_key = "none"
-                if selected_key == none_key:
-                    selected = [] if none_key in selected else [none_key]
-                else:
-                    selected = [item for item in selected if item != none_key]
-                    if selected_key in selected:
-                        selected.remove(selected_key)
-                    else:
-                        selected.append(selected_key)
-
-            else:
-                if selected_key in selected:
-                    selected.remove(selected_key)
-                else:
-                    selected.append(selected_key)
-            answers[step.key] = selected
-            await state.update_data(answers=answers)
-            await callback.message.edit_reply_markup(reply_markup=build_step_keyboard(step, selected))
-            await callback.answer()
-            return
-
-        answers[step.key] = selected_key
+    if data.startswith(f"{CB_SELECT}:") and step.options and not step.multi_select:
+        answers[step.key] = data.split(":")[-1]
         await state.update_data(answers=answers)
         await callback.answer()
         await _go_next(callback.message, state, idx)
         return
 
-    if data == CB_NEXT and step.multi_select:
-        if not answers.get(step.key):
-            await callback.answer("Выберите хотя бы один вариант.", show_alert=True)
-            return
-        await callback.answer()
-        await _go_next(callback.message, state, idx)
-        return
-
     await callback.answer()
 
 
@@ -160,14 +194,8 @@ async def _go_next(message: Message, state: FSMContext, idx: int) -> None:
     next_idx = idx + 1
     if next_idx >= len(STEPS):
         data = await state.get_data()
-        answers = data.get("answers", {})
-        human_answers = _humanize_answers(answers)
-        payload = build_cost_payload(human_answers)
-        text = format_tz_text(payload)
-
-        logger.info("Cost configurator completed user_id=%s", message.from_user.id if message.from_user else "unknown")
-        await message.answer(text)
         await state.clear()
+        await _send_result(message, data.get("answers", {}))
         return
 
     await state.update_data(current_step_index=next_idx)
@@ -175,6 +203,14 @@ async def _go_next(message: Message, state: FSMContext, idx: int) -> None:
     await _show_step(message, STEPS[next_idx], state)
 
 
+async def _send_result(message: Message, answers: dict[str, Any]) -> None:
+    payload = build_cost_payload(_humanize_answers(answers))
+    user_id = message.chat.id
+    logger.info("Cost configurator completed", extra={"user_id": user_id})
+    # клавиатура с кнопкой формы заменяется обратно на главное меню
+    await message.answer(format_tz_text(payload), reply_markup=get_main_menu_keyboard())
+
+
 async def _show_step(message: Message, step: StepConfig, state: FSMContext) -> None:
     data = await state.get_data()
     answers: dict[str, Any] = data.get("answers", {})
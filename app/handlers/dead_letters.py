@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from html import escape
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
+from aiogram.types import ErrorEvent, Message, Update
+
+from app.config import DEAD_LETTER_PATH
+from app.config.brands import current_brand
+from app.services.dead_letters import DeadLetter, DeadLetterStore
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+store = DeadLetterStore(DEAD_LETTER_PATH)
+
+LIST_LIMIT = 20
+_replay_tasks: set[asyncio.Task] = set()
+
+
+def _is_admin(user_id: int) -> bool:
+    return current_brand().is_admin(user_id)
+
+
+async def _pending_entries(bot_id: int) -> list[DeadLetter]:
+    # у каждого бренда свой бот, апдейты повторяются только тем ботом, который их получил
+    return [
+        entry
+        for entry in await store.list_entries()
+        if not entry.replayed and entry.bot_id in (None, bot_id)
+    ]
+
+
+@router.errors()
+async def capture_dead_letter(event: ErrorEvent, bot: Bot, state: FSMContext | None = None) -> None:
+    update = event.update
+    logger.error(
+        "Update %s failed: %r",
+        update.update_id,
+        event.exception,
+        exc_info=(type(event.exception), event.exception, event.exception.__traceback__),
+    )
+
+    raw_state, data = None, {}
+    if state is not None:
+        try:
+            raw_state = await state.get_state()
+            data = await state.get_data()
+        except Exception:
+            logger.exception("Failed to snapshot FSM state for update %s", update.update_id)
+
+    try:
+        await store.capture(bot.id, update, event.exception, raw_state, data)
+    except Exception:
+        logger.exception("Failed to store dead letter for update %s", update.update_id)
+
+    chat = UserContextMiddleware.resolve_event_context(update).chat
+    if chat is not None:
+        try:
+            await bot.send_message(chat.id, "Что-то пошло не так. Попробуйте, пожалуйста, ещё раз чуть позже.")
+        except Exception:
+            logger.warning("Failed to notify chat %s about error", chat.id)
+
+
+@router.message(Command("deadletters"))
+async def list_dead_letters(message: Message, bot: Bot) -> None:
+    if not message.from_user or not _is_admin(message.from_user.id):
+        return
+
+    entries = await _pending_entries(bot.id)
+    if not entries:
+        await message.answer("Необработанных ошибок нет.")
+        return
+
+    lines = [
+        f"<code>{entry.update_id}</code> {escape(entry.handler)}: {escape(entry.error[:120])}"
+        for entry in entries[-LIST_LIMIT:]
+    ]
+    await message.answer(
+        f"Необработанных ошибок: {len(entries)}\n\n"
+        + "\n".join(lines)
+        + "\n\nПовторить: /replay &lt;id ...&gt; или /replay all"
+    )
+
+
+@router.message(Command("replay"))
+async def replay_dead_letters(
+    message: Message,
+    command: CommandObject,
+    bot: Bot,
+    dispatcher: Dispatcher,
+) -> None:
+    if not message.from_user or not _is_admin(message.from_user.id):
+        return
+
+    args = (command.args or "").split()
+    if not args:
+        await message.answer("Укажите id апдейтов или all: /replay 123 456")
+        return
+
+    entries = await _pending_entries(bot.id)
+    if args != ["all"]:
+        try:
+            selected = {int(arg) for arg in args}
+        except ValueError:
+            await message.answer("id апдейтов должны быть числами.")
+            return
+        entries = [entry for entry in entries if entry.update_id in selected]
+
+    if not entries:
+        await message.answer("Подходящих записей нет.")
+        return
+
+    # запись помечается заранее: повторная ошибка создаст новую запись
+    await store.mark_replayed([entry.update_id for entry in entries])
+    updates = [Update.model_validate(entry.update, context={"bot": bot}) for entry in entries]
+
+    # повтор идёт отдельной задачей: апдейты из этого же чата ждут, пока текущий освободит блокировку
+    task = asyncio.create_task(_replay(bot, dispatcher, updates))
+    _replay_tasks.add(task)
+    task.add_done_callback(_replay_tasks.discard)
+
+    await message.answer(f"Отправлено на повтор: {len(updates)}. Новые ошибки появятся в /deadletters.")
+
+
+async def _replay(bot: Bot, dispatcher: Dispatcher, updates: list[Update]) -> None:
+    for update in updates:
+        try:
+            await dispatcher.feed_update(bot, update, dispatcher=dispatcher)
+        except Exception:
+            logger.exception("Replay of update %s failed", update.update_id)
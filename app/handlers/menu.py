@@ -15,12 +15,14 @@ from aiogram.types import (
     InlineKeyboardButton,
 )
 
-from app.config import ADMIN_ID
+from app.config.brands import current_brand
 from app.data.welcome_media import (
     WELCOME_TEXT,
     build_welcome_media_group,
+    remember_welcome_media,
 )
 from app.keyboards.start_kb import get_welcome_keyboard
+from app.services.leads import LEAD_BRAND_PREFIX, LEAD_DATE_FORMAT, LEAD_DATE_PREFIX, LEAD_SEPARATOR
 
 router = Router()
 logger = logging.getLogger(__name__)
@@ -90,7 +92,8 @@ async def show_main_menu(message: Message, text: str = "Выберите раз
 
 async def send_welcome_sequence(message: Message) -> None:
     try:
-        await message.answer_media_group(build_welcome_media_group())
+        messages = await message.answer_media_group(build_welcome_media_group(message.bot.id))
+        remember_welcome_media(message.bot.id, messages)
         await message.answer(
             "\u2063",
             reply_markup=get_welcome_keyboard(),
@@ -104,24 +107,25 @@ async def send_welcome_sequence(message: Message) -> None:
 
 
 async def notify_admin(bot: Bot, user: User, phone: str) -> None:
-    created_at = datetime.now().strftime("%d.%m.%Y %H:%M")
+    created_at = datetime.now().strftime(LEAD_DATE_FORMAT)
 
     username = f"@{user.username}" if user.username else "не указан"
     full_name = user.full_name or "не указано"
 
     admin_text = (
         "📞 Новая заявка\n\n"
-        f"🕒 Дата: {created_at}\n"
+        f"{LEAD_DATE_PREFIX}{created_at}\n"
         f"👤 Имя: {full_name}\n"
         f"🔗 Username: {username}\n"
         f"🆔 ID: {user.id}\n"
         f"📱 Телефон: {phone}"
     )
 
-    await bot.send_message(chat_id=ADMIN_ID, text=admin_text)
+    await bot.send_message(chat_id=current_brand().admin_id, text=admin_text)
 
+    # leads.txt общий для всех ботов: бренд пишется в запись, чтобы сводка считала заявки по брендам
     with open(LEADS_PATH, "a", encoding="utf-8") as file:
-        file.write(admin_text + "\n" + ("-" * 40) + "\n")
+        file.write(admin_text + "\n" + LEAD_BRAND_PREFIX + current_brand().name + "\n" + LEAD_SEPARATOR + "\n")
 
 
 async def handle_lead_submission(message: Message, phone: str) -> None:
@@ -206,7 +210,7 @@ async def company_contacts(message: Message) -> None:
     await message.answer_location(latitude=55.661862, longitude=37.546561)
 
 
-@router.callback_query(F.data == "send_company_card")
+@router.callback_query(F.data == "send_company_card", flags={"early_ack": True})
 async def send_company_card(callback):
     if os.path.exists(COMPANY_CARD_PATH):
         await callback.message.answer_document(FSInputFile(COMPANY_CARD_PATH))
@@ -8,9 +8,11 @@ from aiogram.types import (
     Message,
 )
 
-from app.config import ADMIN_ID
+from app.config.brands import current_brand
+from app.config.project_sections import PROJECT_SECTIONS
 from app.handlers.menu import BTN_DESIGN
 from app.services.projects_service import get_project_by_id
+from app.utils.selection import from_mask, selection_version, to_mask, toggle_mask
 
 router = Router()
 
@@ -18,125 +20,6 @@ router = Router()
 # НАСТРОЙКИ ПРОЕКТА
 # =====================================================
 
-PROJECT_SECTIONS = {
-    "technology": {
-        "name": "Технология",
-        "price": 120_000,
-        "option_percent": 15,
-        "description": (
-            "Раздел для водоподготовки, размещения оборудования, трубопроводов "
-            "и подключения бассейна к инженерным сетям."
-        ),
-        "note": "",
-        "base_sheets": [
-            "Титульный лист",
-            "Пояснительная записка",
-            "Планы и разрезы с размещением закладных деталей системы водоподготовки бассейна",
-            "Планы и разрезы с размещением проемов под закладные детали системы водоподготовки бассейна",
-            "План размещения оборудования системы водоподготовки и аттракционов в техническом помещении бассейна",
-            "План монтажа трубопроводов системы водоподготовки и аттракционов",
-            "Принципиальная схема системы водоподготовки бассейна и аттракционов",
-            "Аксонометрическая схема системы водоподготовки бассейна и аттракционов",
-            "Строительное задание на подключение бассейна к инженерным сетям здания",
-            "Спецификация оборудования",
-        ],
-        "optional_sheets": [
-            "Визуализация бассейна и технического помещения",
-            "Дополнительные планы проемов под закладные детали",
-        ],
-    },
-    "architecture": {
-        "name": "Архитектура",
-        "price": 90_000,
-        "option_percent": 10,
-        "description": (
-            "Раздел для гидроизоляции, облицовки, узлов и архитектурных листов "
-            "по бассейну."
-        ),
-        "note": "Без финишной отделки, ее подбирает заказчик.",
-        "base_sheets": [
-            "Титульный лист",
-            "Технологическая карта гидроизоляции и облицовки",
-            "Общий план размещения бассейна",
-            "Планы и разрезы с размещением закладных деталей",
-            "Планы и разрезы с размещением проемов",
-            "Раскладка плитки + ведомость",
-            "Узлы стен, дна, переливного желоба",
-            "Спецификация материалов",
-        ],
-        "optional_sheets": [
-            "Узлы установки закладных деталей",
-        ],
-    },
-    "electric": {
-        "name": "Электрика",
-        "price": 80_000,
-        "option_percent": 12,
-        "description": (
-            "Раздел для расчета нагрузок, кабельных трасс, схем "
-            "и спецификации по электроснабжению."
-        ),
-        "note": "",
-        "base_sheets": [
-            "Титульный лист",
-            "Общие данные",
-            "Расчет нагрузок",
-            "Однолинейная схема",
-            "План оборудования и кабельных трасс",
-            "План кабельных лотков",
-            "Кабельный журнал",
-            "Схема уравнивания потенциалов",
-            "Спецификация",
-        ],
-        "optional_sheets": [
-            "Принципиальная схема шкафа",
-        ],
-    },
-    "automation": {
-        "name": "Автоматизация",
-        "price": 70_000,
-        "option_percent": 15,
-        "description": (
-            "Раздел для структурной схемы автоматизации, соединений, "
-            "кабельных трасс и спецификации."
-        ),
-        "note": "",
-        "base_sheets": [
-            "Титульный лист",
-            "Общие данные",
-            "Структурная схема автоматизации",
-            "Схема соединений",
-            "План кабельных трасс",
-            "План кабельных лотков",
-            "Спецификация",
-        ],
-        "optional_sheets": [
-            "Принципиальная схема шкафа",
-            "Компоновка шкафа",
-        ],
-    },
-    "constructive": {
-        "name": "Конструктив",
-        "price": 100_000,
-        "option_percent": 8,
-        "description": (
-            "Раздел для чертежей чаши, армирования, разрезов и "
-            "конструктивных узлов."
-        ),
-        "note": "Состав зависит от типа размещения бассейна.",
-        "base_sheets": [
-            "Титульный лист",
-            "Общие данные",
-            "План чаши",
-            "Разрезы и узлы",
-            "Планы армирования",
-            "Разрезы с армированием",
-            "Спецификация материалов",
-        ],
-        "optional_sheets": [],
-    },
-}
-
 OPTIONAL_SHEET_PRICE = 20_000
 ATTRACTION_PRICE = 18_000
 LIGHTING_PRICE = 10_000
@@ -393,24 +276,43 @@ def section_action_keyboard(section_key: str) -> InlineKeyboardMarkup:
 
 
 def section_details_keyboard(section_key: str, selected_options: list[str]) -> InlineKeyboardMarkup:
+    # выбор листов живёт в callback_data (маска и версия списка), в FSM попадает только по «Готово»
+    sheets = PROJECT_SECTIONS[section_key]["optional_sheets"]
+    mask = to_mask(selected_options, sheets)
+    prefix = f"{section_key}:{selection_version(sheets)}"
     buttons = []
 
-    for index, option in enumerate(PROJECT_SECTIONS[section_key]["optional_sheets"]):
-        mark = "☑" if option in selected_options else "⬜"
+    for index, option in enumerate(sheets):
+        mark = "☑" if mask >> index & 1 else "⬜"
         buttons.append([
             InlineKeyboardButton(
                 text=f"{mark} {option}",
-                callback_data=f"section_option:{section_key}:{index}",
+                callback_data=f"section_option:{prefix}:{mask:x}:{toggle_mask(mask, index):x}",
             )
         ])
 
     buttons.append([
-        InlineKeyboardButton(text="Готово", callback_data=f"section_done:{section_key}")
+        InlineKeyboardButton(text="Готово", callback_data=f"section_done:{prefix}:{mask:x}")
     ])
 
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+def _parse_section_selection(data: str, masks_count: int) -> tuple[str, list[str], list[int]] | None:
+    # кнопки старого формата (section_done:<key>) и чужие данные считаются устаревшими
+    parts = data.split(":")
+    if len(parts) != 3 + masks_count:
+        return None
+    _, section_key, version, *masks = parts
+    section = PROJECT_SECTIONS.get(section_key)
+    if section is None or version != selection_version(section["optional_sheets"]):
+        return None
+    try:
+        return section_key, section["optional_sheets"], [int(mask, 16) for mask in masks]
+    except ValueError:
+        return None
+
+
 def attractions_keyboard(current: int) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
         [
@@ -535,26 +437,14 @@ async def open_section_details(callback: CallbackQuery, state: FSMContext):
 
 
 @router.callback_query(ProjectFSM.section_details, F.data.startswith("section_option:"))
-async def toggle_section_option(callback: CallbackQuery, state: FSMContext):
-    _, section_key, option_index_raw = callback.data.split(":")
-    option_index = int(option_index_raw)
-    option_name = PROJECT_SECTIONS[section_key]["optional_sheets"][option_index]
-
-    data = await state.get_data()
-    designs = dict(data.get("designs", {}))
-    selected_options = list(designs.get(section_key, {}).get("selected_options", []))
-
-    if option_name in selected_options:
-        selected_options.remove(option_name)
-    else:
-        selected_options.append(option_name)
+async def toggle_section_option(callback: CallbackQuery):
+    parsed = _parse_section_selection(callback.data, masks_count=2)
+    if parsed is None:
+        await callback.answer("Эти кнопки устарели. Откройте раздел заново.")
+        return
 
-    designs[section_key] = _build_design_payload(
-        section_key,
-        mode="detailed",
-        selected_options=selected_options,
-    )
-    await state.update_data(designs=designs, current_section=section_key)
+    section_key, sheets, (_, new_mask) = parsed
+    selected_options = from_mask(new_mask, sheets)
 
     await callback.message.edit_text(
         _render_section_details_text(section_key, selected_options),
@@ -566,15 +456,20 @@ async def toggle_section_option(callback: CallbackQuery, state: FSMContext):
 
 @router.callback_query(ProjectFSM.section_details, F.data.startswith("section_done:"))
 async def save_section_details(callback: CallbackQuery, state: FSMContext):
-    key = callback.data.split(":", maxsplit=1)[1]
+    parsed = _parse_section_selection(callback.data, masks_count=1)
     data = await state.get_data()
+    # сохранять может только клавиатура раздела, открытого сейчас
+    if parsed is None or parsed[0] != data.get("current_section"):
+        await callback.answer("Эти кнопки устарели. Откройте раздел заново.")
+        return
+
+    key, sheets, (mask,) = parsed
     designs = dict(data.get("designs", {}))
-    existing_options = list(designs.get(key, {}).get("selected_options", []))
 
     designs[key] = _build_design_payload(
         key,
         mode="detailed",
-        selected_options=existing_options,
+        selected_options=from_mask(mask, sheets),
     )
     selected = _get_selected_section_keys(designs)
 
@@ -824,7 +719,7 @@ async def process_email(message: Message, state: FSMContext):
             f"💰 Сумма: <b>{data.get('total', 0):,} ₽</b>"
         )
 
-    await message.bot.send_message(ADMIN_ID, admin_text)
+    await message.bot.send_message(current_brand().admin_id, admin_text)
 
     await message.answer(
         "✅ Заявка отправлена.\nНаш специалист свяжется с вами."
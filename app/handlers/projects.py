@@ -1,23 +1,62 @@
+from html import escape
+
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
-from aiogram.types import CallbackQuery, InputMediaPhoto, Message
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, InputMediaPhoto, Message
 
 from app.data.projects import ProjectCatalogItem
 from app.handlers.menu import BTN_PROJECTS
 from app.handlers.project_configurator import ProjectFSM
-from app.keyboards.projects_kb import keyboard_project_card, keyboard_projects_list
-from app.services.projects_service import get_project_by_id
+from app.keyboards.projects_kb import (
+    ANY,
+    CB_PROJECTS_CITY,
+    CB_PROJECTS_LIST,
+    PROJECT_AREA_RANGES,
+    PROJECT_LENGTH_RANGES,
+    PROJECTS_PAGE_SIZE,
+    keyboard_project_card,
+    keyboard_project_cities,
+    keyboard_project_types,
+    keyboard_projects_list,
+)
+from app.services.projects_service import (
+    filter_projects,
+    get_all_projects,
+    get_city_facets,
+    get_city_label,
+    get_project_by_id,
+    get_type_facets,
+    get_type_label,
+)
 
 router = Router()
 
+CATALOG_CHANGED_TEXT = "Каталог обновился, выберите фильтр заново"
+
 
-def _build_projects_list_text() -> str:
+def _cities_view() -> tuple[str, InlineKeyboardMarkup | None]:
+    total = len(get_all_projects())
+    if not total:
+        return "🏗 <b>Реализованные проекты</b>\n\nСкоро здесь появятся наши объекты.", None
     return (
-        "🏗 <b>Реализованные проекты</b>\n\n"
-        "Выберите проект, чтобы посмотреть карточку и перейти в заявку."
+        "🏗 <b>Реализованные проекты</b>\n\nВыберите город:",
+        keyboard_project_cities(get_city_facets(), total),
     )
 
 
+def _filter_title(city: str, project_type: str = ANY) -> str | None:
+    # None — токен пропал из каталога: клавиатура устарела
+    parts = []
+    for token, get_label in ((city, get_city_label), (project_type, get_type_label)):
+        if token == ANY:
+            continue
+        label = get_label(token)
+        if label is None:
+            return None
+        parts.append(escape(label))
+    return " · ".join(parts) or "Все проекты"
+
+
 def _build_project_card_text(project: ProjectCatalogItem) -> str:
     return (
         f"🏊 <b>{project.title}</b>\n\n"
@@ -28,23 +67,80 @@ def _build_project_card_text(project: ProjectCatalogItem) -> str:
     )
 
 
-async def _show_projects_list(message: Message) -> None:
-    await message.answer(
-        _build_projects_list_text(),
-        reply_markup=keyboard_projects_list(),
-    )
+async def _show_cities(callback: CallbackQuery, notice: str | None = None) -> None:
+    text, keyboard = _cities_view()
+    await callback.message.edit_text(text, reply_markup=keyboard)
+    await callback.answer(notice)
 
 
 @router.message(F.text == BTN_PROJECTS)
 async def realized_projects(message: Message) -> None:
-    await _show_projects_list(message)
+    text, keyboard = _cities_view()
+    await message.answer(text, reply_markup=keyboard)
 
 
 @router.callback_query(F.data == "projects")
 async def projects_list_callback(callback: CallbackQuery) -> None:
+    await _show_cities(callback)
+
+
+@router.callback_query(F.data.startswith(CB_PROJECTS_CITY))
+async def projects_city_filter(callback: CallbackQuery) -> None:
+    city = callback.data.removeprefix(CB_PROJECTS_CITY)
+    title = _filter_title(city)
+    if title is None:
+        await _show_cities(callback, CATALOG_CHANGED_TEXT)
+        return
+
+    types = get_type_facets(None if city == ANY else city)
+    await callback.message.edit_text(
+        f"🏗 <b>{title}</b>\n\nВыберите тип бассейна:",
+        reply_markup=keyboard_project_types(city, types, sum(project_type.count for project_type in types)),
+    )
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith(CB_PROJECTS_LIST))
+async def projects_filtered_list(callback: CallbackQuery) -> None:
+    try:
+        city, project_type, length, area, raw_page = callback.data.removeprefix(CB_PROJECTS_LIST).split(":")
+        page = int(raw_page)
+        length_range = None if length == ANY else PROJECT_LENGTH_RANGES[int(length)]
+        area_range = None if area == ANY else PROJECT_AREA_RANGES[int(area)]
+    except (ValueError, IndexError):
+        # кнопки прежнего формата
+        await _show_cities(callback, CATALOG_CHANGED_TEXT)
+        return
+
+    title = _filter_title(city, project_type)
+    projects = filter_projects(
+        None if city == ANY else city,
+        None if project_type == ANY else project_type,
+        length=length_range[1:] if length_range else None,
+        area=area_range[1:] if area_range else None,
+    )
+    # пустая выдача без фильтра по размеру означает, что проекты убрали из каталога
+    if title is None or not projects and length_range is None and area_range is None:
+        await _show_cities(callback, CATALOG_CHANGED_TEXT)
+        return
+
+    for size_range in (length_range, area_range):
+        if size_range:
+            title = f"{title} · {size_range[0]}"
+    if projects:
+        pages = (len(projects) + PROJECTS_PAGE_SIZE - 1) // PROJECTS_PAGE_SIZE
+        page = min(max(page, 0), pages - 1)
+        counter = f" · стр. {page + 1}/{pages}" if pages > 1 else ""
+        text = (
+            f"🏗 <b>{title}</b> — {len(projects)}{counter}\n\n"
+            "Выберите проект, чтобы посмотреть карточку и перейти в заявку."
+        )
+    else:
+        page = 0
+        text = f"🏗 <b>{title}</b>\n\nПроектов такого размера пока нет, выберите другой диапазон."
     await callback.message.edit_text(
-        _build_projects_list_text(),
-        reply_markup=keyboard_projects_list(),
+        text,
+        reply_markup=keyboard_projects_list(projects, city, project_type, length, area, page),
     )
     await callback.answer()
 
@@ -67,7 +163,7 @@ async def project_request(callback: CallbackQuery, state: FSMContext) -> None:
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("project_"))
+@router.callback_query(F.data.startswith("project_"), flags={"early_ack": True})
 async def project_card(callback: CallbackQuery) -> None:
     project_id = callback.data.removeprefix("project_")
     project = get_project_by_id(project_id)
@@ -1,11 +1,13 @@
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
-from app.config.cost_steps import StepConfig
+from app.config.cost_steps import STEPS, StepConfig
+from app.utils.selection import selection_version, to_mask, toggle_mask
 
 CB_PREFIX = "cost"
 CB_SELECT = f"{CB_PREFIX}:select"
-CB_NEXT = f"{CB_PREFIX}:next"
-CB_CLEAR = f"{CB_PREFIX}:clear"
+# множественный выбор: cost:toggle:<шаг>:<версия>:<текущая маска>:<новая маска>, cost:done:<шаг>:<версия>:<маска>
+CB_TOGGLE = f"{CB_PREFIX}:toggle"
+CB_DONE = f"{CB_PREFIX}:done"
 CB_BACK = f"{CB_PREFIX}:back"
 CB_CANCEL = f"{CB_PREFIX}:cancel"
 CB_ENGINEER = f"{CB_PREFIX}:engineer"
@@ -21,28 +23,64 @@ def build_step_keyboard(step: StepConfig, selected: list[str] | None = None) ->
     if not step.options:
         return _footer_keyboard(step)
 
-    selected = selected or []
-    rows: list[list[InlineKeyboardButton]] = []
+    if step.multi_select:
+        return _multi_select_keyboard(step, selected or [])
 
+    rows: list[list[InlineKeyboardButton]] = []
     for option in step.options:
-        checked = "✅ " if option.key in selected else ""
         rows.append([
             InlineKeyboardButton(
-                text=f"{checked}{option.label}",
+                text=option.label,
                 callback_data=f"{CB_SELECT}:{option.key}",
             )
         ])
 
-    if step.multi_select:
+    rows.extend(_footer_rows(step))
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+def _multi_select_keyboard(step: StepConfig, selected: list[str]) -> InlineKeyboardMarkup:
+    keys = [option.key for option in step.options]
+    exclusive = keys.index(step.exclusive_option) if step.exclusive_option else None
+    mask = to_mask(selected, keys)
+    prefix = f"{STEPS.index(step)}:{selection_version(keys)}"
+
+    rows: list[list[InlineKeyboardButton]] = []
+    for index, option in enumerate(step.options):
+        checked = "✅ " if mask >> index & 1 else ""
+        new_mask = toggle_mask(mask, index, exclusive)
         rows.append([
-            InlineKeyboardButton(text=BTN_DONE, callback_data=CB_NEXT),
-            InlineKeyboardButton(text=BTN_CLEAR, callback_data=CB_CLEAR),
+            InlineKeyboardButton(
+                text=f"{checked}{option.label}",
+                callback_data=f"{CB_TOGGLE}:{prefix}:{mask:x}:{new_mask:x}",
+            )
         ])
 
+    rows.append([
+        InlineKeyboardButton(text=BTN_DONE, callback_data=f"{CB_DONE}:{prefix}:{mask:x}"),
+        InlineKeyboardButton(text=BTN_CLEAR, callback_data=f"{CB_TOGGLE}:{prefix}:{mask:x}:0"),
+    ])
     rows.extend(_footer_rows(step))
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
+def parse_selection_callback(data: str, masks_count: int) -> tuple[StepConfig, list[int]] | None:
+    """Разбирает cost:toggle/cost:done; None, если кнопка от другой версии шагов или в чужом формате."""
+    parts = data.split(":")
+    if len(parts) != 4 + masks_count:
+        return None
+    _, _, step_index, version, *masks = parts
+    if not step_index.isdigit() or int(step_index) >= len(STEPS):
+        return None
+    step = STEPS[int(step_index)]
+    if not step.multi_select or version != selection_version([option.key for option in step.options]):
+        return None
+    try:
+        return step, [int(mask, 16) for mask in masks]
+    except ValueError:
+        return None
+
+
 def _footer_keyboard(step: StepConfig) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=_footer_rows(step))
 
@@ -1,9 +1,71 @@
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
-from app.services.projects_service import get_all_projects
+from app.data.projects import CatalogFacet, ProjectCatalogItem
 
+PROJECTS_PAGE_SIZE = 8
+# диапазоны размера бассейна — полуинтервалы [от, до): длина в метрах, площадь зеркала в м²
+PROJECT_LENGTH_RANGES: tuple[tuple[str, float | None, float | None], ...] = (
+    ("до 6 м", None, 6),
+    ("6–10 м", 6, 10),
+    ("10–15 м", 10, 15),
+    ("от 15 м", 15, None),
+)
+PROJECT_AREA_RANGES: tuple[tuple[str, float | None, float | None], ...] = (
+    ("до 20 м²", None, 20),
+    ("20–40 м²", 20, 40),
+    ("40–80 м²", 40, 80),
+    ("от 80 м²", 80, None),
+)
 
-def keyboard_projects_list() -> InlineKeyboardMarkup:
+# фильтр каталога: projects:city:<город> → projects:list:<город>:<тип>:<длина>:<площадь>:<страница>;
+# вместо города и типа передаются токены facet_token, длина и площадь — индексы диапазонов, ANY — без фильтра
+CB_PROJECTS_CITY = "projects:city:"
+CB_PROJECTS_LIST = "projects:list:"
+ANY = "*"
+
+
+def _pairs(buttons: list[InlineKeyboardButton]) -> list[list[InlineKeyboardButton]]:
+    return [buttons[index:index + 2] for index in range(0, len(buttons), 2)]
+
+
+def keyboard_project_cities(cities: list[CatalogFacet], total: int) -> InlineKeyboardMarkup:
+    buttons = _pairs(
+        [
+            InlineKeyboardButton(text=f"📍 {city.label} ({city.count})", callback_data=f"{CB_PROJECTS_CITY}{city.token}")
+            for city in cities
+        ]
+    )
+    buttons.append([InlineKeyboardButton(text=f"🌍 Все города ({total})", callback_data=f"{CB_PROJECTS_CITY}{ANY}")])
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
+def keyboard_project_types(city: str, types: list[CatalogFacet], total: int) -> InlineKeyboardMarkup:
+    buttons = _pairs(
+        [
+            InlineKeyboardButton(
+                text=f"💧 {project_type.label} ({project_type.count})",
+                callback_data=f"{CB_PROJECTS_LIST}{city}:{project_type.token}:{ANY}:{ANY}:0",
+            )
+            for project_type in types
+        ]
+    )
+    buttons.append(
+        [InlineKeyboardButton(text=f"Все типы ({total})", callback_data=f"{CB_PROJECTS_LIST}{city}:{ANY}:{ANY}:{ANY}:0")]
+    )
+    buttons.append([InlineKeyboardButton(text="⬅ К выбору города", callback_data="projects")])
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
+def keyboard_projects_list(
+    projects: tuple[ProjectCatalogItem, ...],
+    city: str,
+    project_type: str,
+    length: str,
+    area: str,
+    page: int,
+) -> InlineKeyboardMarkup:
+    prefix = f"{CB_PROJECTS_LIST}{city}:{project_type}"
+    start = page * PROJECTS_PAGE_SIZE
     buttons = [
         [
             InlineKeyboardButton(
@@ -11,8 +73,39 @@ def keyboard_projects_list() -> InlineKeyboardMarkup:
                 callback_data=f"project_{project.id}",
             )
         ]
-        for project in get_all_projects()
+        for project in projects[start:start + PROJECTS_PAGE_SIZE]
     ]
+
+    navigation = []
+    if page > 0:
+        navigation.append(InlineKeyboardButton(text="◀", callback_data=f"{prefix}:{length}:{area}:{page - 1}"))
+    if start + PROJECTS_PAGE_SIZE < len(projects):
+        navigation.append(InlineKeyboardButton(text="▶", callback_data=f"{prefix}:{length}:{area}:{page + 1}"))
+    if navigation:
+        buttons.append(navigation)
+
+    # повторное нажатие на выбранный диапазон снимает этот фильтр
+    lengths = []
+    for index, (label, _, _) in enumerate(PROJECT_LENGTH_RANGES):
+        selected = str(index) == length
+        lengths.append(
+            InlineKeyboardButton(
+                text=f"✅ {label}" if selected else f"📏 {label}",
+                callback_data=f"{prefix}:{ANY if selected else index}:{area}:0",
+            )
+        )
+    areas = []
+    for index, (label, _, _) in enumerate(PROJECT_AREA_RANGES):
+        selected = str(index) == area
+        areas.append(
+            InlineKeyboardButton(
+                text=f"✅ {label}" if selected else f"◻ {label}",
+                callback_data=f"{prefix}:{length}:{ANY if selected else index}:0",
+            )
+        )
+    buttons.extend(_pairs(lengths))
+    buttons.extend(_pairs(areas))
+    buttons.append([InlineKeyboardButton(text="⬅ К выбору типа", callback_data=f"{CB_PROJECTS_CITY}{city}")])
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
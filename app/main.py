@@ -1,45 +1,8 @@
-import asyncio
-import logging
+from app.utils.timing import startup_timer
 
-from aiogram import Bot, Dispatcher
-from aiogram.client.default import DefaultBotProperties
-from aiogram.enums import ParseMode
-from aiogram.fsm.storage.memory import MemoryStorage
-
-from app.config import settings
-from app.db.base import Base
-from app.db.engine import engine
-from app.handlers.admin_projects import router as admin_projects_router
-from app.fsm.handlers import router as project_router
-
-
-async def on_startup() -> None:
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-
-async def on_shutdown(bot: Bot) -> None:
-    await bot.session.close()
-    await engine.dispose()
-
-
-async def main() -> None:
-    logging.basicConfig(level=logging.INFO)
-
-    bot = Bot(
-        token=settings.bot_token,
-        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
-    )
-    dp = Dispatcher(storage=MemoryStorage())
-    dp.include_router(project_router)
-    dp.include_router(admin_projects_router)
-
-    await on_startup()
-    try:
-        await dp.start_polling(bot)
-    finally:
-        await on_shutdown(bot)
+with startup_timer.stage("import app.factory"):
+    from app.factory import run
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run()
@@ -0,0 +1,22 @@
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.types import TelegramObject
+
+from app.config.brands import BRANDS_BY_BOT_ID, use_brand
+
+
+class BrandMiddleware(BaseMiddleware):
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        bot: Bot = data["bot"]
+        brand = BRANDS_BY_BOT_ID[bot.id]
+        # каждый апдейт обрабатывается в своей задаче, поэтому бренд не сбрасывается:
+        # он нужен и обработчику ошибок, который срабатывает уже после выхода из цепочки
+        use_brand(brand)
+        data["brand"] = brand
+        return await handler(event, data)
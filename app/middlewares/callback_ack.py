@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.dispatcher.flags import get_flag
+from aiogram.methods import AnswerCallbackQuery, TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+from aiogram.types import CallbackQuery, TelegramObject
+
+logger = logging.getLogger(__name__)
+
+ACK_GRACE = 0.2
+SLOW_HANDLER_THRESHOLD = 0.5
+
+
+class _PendingAck:
+    __slots__ = ("chat_id", "answered", "early")
+
+    def __init__(self, chat_id: int | None):
+        self.chat_id = chat_id
+        self.answered = asyncio.Event()
+        self.early = False
+
+
+# Callback-запросы, на которые сейчас ждут ответа хендлера; общий для диспетчера и сессий ботов
+_pending: dict[str, _PendingAck] = {}
+
+
+# Ранний ответ на callback: если хендлер не ответил сам за ACK_GRACE, спиннер на кнопке
+# снимается пустым answerCallbackQuery. Поздний ответ хендлера тогда не отправляется,
+# а алерт («Проект не найден») приходит обычным сообщением.
+class EarlyCallbackAck(BaseMiddleware):
+    def __init__(self, grace: float = ACK_GRACE, slow_threshold: float = SLOW_HANDLER_THRESHOLD):
+        self.grace = grace
+        self.slow_threshold = slow_threshold
+        self.latency: dict[str, float] = {}
+        self.early_acks = 0
+
+    def _wants_early_ack(self, handler: HandlerObject, name: str) -> bool:
+        flag = get_flag(handler, "early_ack")
+        if flag is not None:
+            return bool(flag)
+        # хендлер, который в среднем отвечает дольше порога, подтверждается заранее автоматически
+        return self.latency.get(name, 0.0) > self.slow_threshold
+
+    def _record_latency(self, name: str, elapsed: float) -> None:
+        previous = self.latency.get(name)
+        self.latency[name] = elapsed if previous is None else previous * 0.8 + elapsed * 0.2
+
+    async def _ack_after_grace(self, bot: Bot, query: CallbackQuery, pending: _PendingAck) -> None:
+        try:
+            await asyncio.wait_for(pending.answered.wait(), self.grace)
+            return
+        except asyncio.TimeoutError:
+            pass
+
+        # answered выставит CallbackAckGuard, пропуская этот запрос в сеть
+        pending.early = True
+        self.early_acks += 1
+        try:
+            await bot.answer_callback_query(query.id)
+        except Exception:
+            logger.warning("Failed to acknowledge callback %s early", query.id, exc_info=True)
+        pending.answered.set()
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        handler_object: HandlerObject | None = data.get("handler")
+        if not isinstance(event, CallbackQuery) or handler_object is None:
+            return await handler(event, data)
+
+        name = f"{handler_object.callback.__module__}.{handler_object.callback.__qualname__}"
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        if not self._wants_early_ack(handler_object, name):
+            try:
+                return await handler(event, data)
+            finally:
+                self._record_latency(name, loop.time() - started)
+
+        chat_id = event.message.chat.id if event.message else event.from_user.id
+        pending = _pending[event.id] = _PendingAck(chat_id)
+        ack_task = asyncio.create_task(self._ack_after_grace(data["bot"], event, pending))
+        try:
+            return await handler(event, data)
+        finally:
+            self._record_latency(name, loop.time() - started)
+            if not pending.answered.is_set():
+                ack_task.cancel()
+            _pending.pop(event.id, None)
+
+    def stats(self) -> dict[str, Any]:
+        return {"early_acks": self.early_acks, "pending": len(_pending)}
+
+
+# Middleware сессии: не даёт хендлеру повторно ответить на уже подтверждённый callback
+class CallbackAckGuard(BaseRequestMiddleware):
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        if not isinstance(method, AnswerCallbackQuery) or method.callback_query_id not in _pending:
+            return await make_request(bot, method)
+
+        pending = _pending[method.callback_query_id]
+        if not pending.answered.is_set():
+            pending.answered.set()
+            return await make_request(bot, method)
+
+        # всплывающее уведомление после раннего ответа уже не показать — алерт уходит сообщением
+        if pending.early and method.text and method.show_alert and pending.chat_id is not None:
+            await bot.send_message(pending.chat_id, method.text)
+        return True
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.dispatcher.flags import get_flag
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import CallbackQuery, Message, TelegramObject
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_TEXT = "⏳ Сервис отвечает слишком долго. Попробуйте ещё раз чуть позже."
+FALLBACK_TIMEOUT = 5.0
+
+# Дедлайны по модулю роутера; для отдельного хендлера — flags={"deadline": секунды}
+ROUTER_DEADLINES: dict[str, float] = {
+    "app.handlers.admin_projects": 60.0,
+    "app.fsm.handlers": 15.0,
+}
+
+
+class DeadlineMiddleware(BaseMiddleware):
+    def __init__(self, default: float, router_deadlines: dict[str, float] | None = None):
+        self.default = default
+        self.router_deadlines = ROUTER_DEADLINES if router_deadlines is None else router_deadlines
+        self.timeouts: Counter[str] = Counter()
+
+    def resolve_deadline(self, handler: HandlerObject) -> float | None:
+        deadline = get_flag(handler, "deadline")
+        if deadline is None:
+            deadline = self.router_deadlines.get(handler.callback.__module__, self.default)
+        return deadline or None
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        handler_object: HandlerObject | None = data.get("handler")
+        if handler_object is None:
+            return await handler(event, data)
+
+        name = f"{handler_object.callback.__module__}.{handler_object.callback.__qualname__}"
+        started = time.perf_counter()
+        try:
+            return await self._call_with_deadline(handler, event, data, handler_object, name)
+        finally:
+            if logger.isEnabledFor(logging.DEBUG):
+                user = data.get("event_from_user")
+                logger.debug(
+                    "Handler finished",
+                    extra={
+                        "handler": name,
+                        "latency": round(time.perf_counter() - started, 4),
+                        "user_id": user.id if user else None,
+                    },
+                )
+
+    async def _call_with_deadline(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+        handler_object: HandlerObject,
+        name: str,
+    ) -> Any:
+        deadline = self.resolve_deadline(handler_object)
+        if deadline is None:
+            return await handler(event, data)
+
+        timeout = asyncio.timeout(deadline)
+        try:
+            # по истечении дедлайна хендлер отменяется, async with внутри него освобождают сессии БД
+            async with timeout:
+                return await handler(event, data)
+        except TimeoutError:
+            if not timeout.expired():
+                raise
+            self.timeouts[name] += 1
+            logger.error("Handler %s exceeded deadline of %s s", name, deadline)
+            await self._send_fallback(event)
+
+    async def _send_fallback(self, event: TelegramObject) -> None:
+        try:
+            async with asyncio.timeout(FALLBACK_TIMEOUT):
+                if isinstance(event, CallbackQuery):
+                    try:
+                        await event.answer(FALLBACK_TEXT, show_alert=True)
+                    except TelegramBadRequest:
+                        # запрос уже подтверждён хендлером — сообщаем обычным сообщением
+                        if event.message is not None:
+                            await event.message.answer(FALLBACK_TEXT)
+                elif isinstance(event, Message):
+                    await event.answer(FALLBACK_TEXT)
+        except Exception:
+            logger.warning("Failed to deliver deadline fallback", exc_info=True)
+
+    def stats(self) -> dict[str, int]:
+        return dict(self.timeouts)
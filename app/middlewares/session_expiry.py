@@ -0,0 +1,33 @@
+import logging
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.fsm.context import FSMContext
+from aiogram.types import CallbackQuery, Message, TelegramObject
+
+logger = logging.getLogger(__name__)
+
+SESSION_EXPIRED_TEXT = (
+    "Предыдущая сессия истекла: вы долго не возвращались, и введённые данные не сохранились. "
+    "Пожалуйста, начните заново из меню."
+)
+
+
+# Outer-middleware: срабатывает до фильтров, поэтому видит и нажатия на кнопки сценария,
+# который уже удалён из хранилища. Предупреждение отправляется один раз, событие обрабатывается дальше.
+class SessionExpiryMiddleware(BaseMiddleware):
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        state: FSMContext | None = data.get("state")
+        pop_expired = getattr(state.storage, "pop_expired", None) if state is not None else None
+        expired_state = pop_expired(state.key) if pop_expired is not None else None
+        if expired_state is not None:
+            logger.info("FSM session expired", extra={"user_id": state.key.user_id, "step": expired_state})
+            message = event.message if isinstance(event, CallbackQuery) else event
+            if isinstance(message, Message):
+                await message.answer(SESSION_EXPIRED_TEXT)
+        return await handler(event, data)
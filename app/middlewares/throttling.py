@@ -0,0 +1,125 @@
+import logging
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import CallbackQuery, TelegramObject, User
+
+from app.config.brands import current_brand
+
+logger = logging.getLogger(__name__)
+
+# (событий в секунду, размер пачки); None — без ограничения
+Limit = tuple[float, int] | None
+
+# Лимиты по префиксу callback_data: повторные нажатия на карточку заново шлют весь альбом
+CALLBACK_LIMITS: dict[str, Limit] = {
+    "project_": (0.5, 3),
+    "cost:": (3.0, 8),
+}
+# Лимиты по модулю роутера; для отдельного хендлера — flags={"throttle": (rate, burst)} или False
+ROUTER_LIMITS: dict[str, Limit] = {
+    "app.handlers.admin_projects": None,
+    "app.handlers.dead_letters": None,
+}
+DEFAULT_LIMIT: Limit = (2.0, 10)
+MAX_BUCKETS = 20_000
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, burst: int, now: float):
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, rate: float, burst: int, now: float) -> bool:
+        # события разных чатов одного пользователя могут прийти не по порядку времени получения
+        if now > self.updated:
+            self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+            self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    def __init__(
+        self,
+        default: Limit = DEFAULT_LIMIT,
+        callback_limits: dict[str, Limit] | None = None,
+        router_limits: dict[str, Limit] | None = None,
+        max_buckets: int = MAX_BUCKETS,
+    ):
+        self.default = default
+        self.callback_limits = CALLBACK_LIMITS if callback_limits is None else callback_limits
+        self.router_limits = ROUTER_LIMITS if router_limits is None else router_limits
+        self.max_buckets = max_buckets
+        # LRU: при переполнении вытесняются давно неактивные пользователи, их корзины всё равно полные
+        self._buckets: OrderedDict[tuple[int, str], _Bucket] = OrderedDict()
+        self.dropped: Counter[str] = Counter()
+
+    def resolve_limit(self, handler: HandlerObject, event: TelegramObject) -> tuple[str, Limit]:
+        flag = get_flag(handler, "throttle")
+        name = f"{handler.callback.__module__}.{handler.callback.__qualname__}"
+        if flag is not None:
+            return name, flag or None
+
+        if isinstance(event, CallbackQuery) and event.data:
+            for prefix, limit in self.callback_limits.items():
+                if event.data.startswith(prefix):
+                    return prefix, limit
+
+        module = handler.callback.__module__
+        if module in self.router_limits:
+            return module, self.router_limits[module]
+        return "default", self.default
+
+    def _bucket(self, key: tuple[int, str], burst: int, now: float) -> _Bucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_buckets:
+                self._buckets.popitem(last=False)
+            bucket = self._buckets[key] = _Bucket(burst, now)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        handler_object: HandlerObject | None = data.get("handler")
+        user: User | None = data.get("event_from_user")
+        if handler_object is None or user is None or current_brand().is_admin(user.id):
+            return await handler(event, data)
+
+        action, limit = self.resolve_limit(handler_object, event)
+        if limit is None:
+            return await handler(event, data)
+
+        rate, burst = limit
+        # события одного чата ждут своей очереди в events_isolation; считаем по времени получения,
+        # иначе за время ожидания корзина успевает наполниться и поток нажатий проходит целиком
+        now = data.get("received_at") or time.monotonic()
+        if self._bucket((user.id, action), burst, now).take(rate, burst, now):
+            return await handler(event, data)
+
+        # лишнее событие молча отбрасывается; на callback отвечаем пустым ответом, чтобы снять спиннер
+        self.dropped[action] += 1
+        logger.debug("Throttled event", extra={"user_id": user.id, "handler": action})
+        if isinstance(event, CallbackQuery):
+            try:
+                await event.answer()
+            except Exception:
+                pass
+        return None
+
+    def stats(self) -> dict[str, Any]:
+        return {"buckets": len(self._buckets), "dropped": dict(self.dropped)}
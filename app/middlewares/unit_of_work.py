@@ -0,0 +1,37 @@
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.fsm.context import FSMContext
+from aiogram.types import TelegramObject
+
+from app.fsm.context import BufferedFSMContext
+
+
+# Outer-middleware апдейта, стоит после FSM-middleware диспетчера (внутри блокировки чата):
+# подменяет FSMContext буферизованным и один раз записывает изменения по завершении апдейта.
+# Запись выполняется и при ошибке хендлера — как раньше, когда каждый update_data писал сразу.
+class FSMUnitOfWorkMiddleware(BaseMiddleware):
+    def __init__(self) -> None:
+        self.commits = 0
+        self.skipped = 0
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        state: FSMContext | None = data.get("state")
+        if state is None:
+            return await handler(event, data)
+
+        context = BufferedFSMContext(state.storage, state.key, data.get("raw_state"))
+        data["state"] = context
+        try:
+            return await handler(event, data)
+        finally:
+            if context.dirty:
+                self.commits += 1
+            else:
+                self.skipped += 1
+            await context.commit()
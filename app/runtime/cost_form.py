@@ -0,0 +1,25 @@
+import logging
+from urllib.parse import urlparse
+
+from aiohttp import web
+
+from app.services.cost_form import render_cost_form
+
+logger = logging.getLogger(__name__)
+
+
+async def start_cost_form_server(host: str, port: int, public_url: str) -> web.AppRunner:
+    # страница статична: собирается из STEPS один раз при старте
+    page = render_cost_form()
+    path = urlparse(public_url).path or "/"
+
+    async def cost_form(request: web.Request) -> web.Response:
+        return web.Response(text=page, content_type="text/html", headers={"Cache-Control": "no-cache"})
+
+    app = web.Application()
+    app.router.add_get(path, cost_form)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host=host, port=port).start()
+    logger.info("Cost form served on http://%s:%s%s for %s", host, port, path, public_url)
+    return runner
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import time
+from typing import Any
+
+from aiogram import Dispatcher
+from aiohttp import web
+
+from app.runtime.inflight import InFlightUpdates
+from app.runtime.outbound import OutboundScheduler
+from app.runtime.polling import LedgerPolling
+
+logger = logging.getLogger(__name__)
+
+LAG_SAMPLE_INTERVAL = 0.5
+WATCHDOG_INTERVAL = 5.0
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = LAG_SAMPLE_INTERVAL, threshold: float = 0.5):
+        self.interval = interval
+        self.threshold = threshold
+        self.last = 0.0
+        self.peak = 0.0
+        self.average = 0.0
+        self.stalls = 0
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            # насколько позже запланированного проснулся таймер — столько loop был занят
+            lag = max(0.0, loop.time() - started - self.interval)
+            self.last = lag
+            self.peak = max(self.peak, lag)
+            self.average = self.average * 0.9 + lag * 0.1
+            if lag > self.threshold:
+                self.stalls += 1
+                logger.warning("Event loop stalled for %.3f s", lag)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "last": round(self.last, 4),
+            "average": round(self.average, 4),
+            "peak": round(self.peak, 4),
+            "stalls": self.stalls,
+        }
+
+
+# Сторож процесса: задержка event loop, свежесть апдейтов и очередь исходящих на локальном HTTP
+class Watchdog:
+    def __init__(
+        self,
+        dp: Dispatcher,
+        inflights: list[InFlightUpdates],
+        scheduler: OutboundScheduler,
+        polling: LedgerPolling | None = None,
+        lag_threshold: float = 0.5,
+        stall_timeout: float = 90.0,
+        restart_polling: bool = True,
+    ):
+        self.dp = dp
+        self.inflights = inflights
+        self.scheduler = scheduler
+        self.polling = polling
+        self.stall_timeout = stall_timeout
+        self.restart_polling = restart_polling
+        self.lag = LoopLagMonitor(threshold=lag_threshold)
+        self.ready = False
+        self._tasks: list[asyncio.Task] = []
+        self._runner: web.AppRunner | None = None
+        self._address: tuple[str, int] | None = None
+
+        dp.startup.register(self._mark_ready)
+        dp.shutdown.register(self._mark_not_ready)
+        # порт занимает только лидер: резервный экземпляр на том же хосте ждёт аренду без HTTP,
+        # а уходящий лидер освобождает порт до того, как снимет аренду
+        dp.startup.register(self._serve)
+        dp.shutdown.register(self._close_http)
+
+    async def _mark_ready(self) -> None:
+        self.ready = True
+
+    async def _mark_not_ready(self) -> None:
+        self.ready = False
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(WATCHDOG_INTERVAL)
+            if self.polling is not None and self.restart_polling:
+                self.polling.restart_stale(self.stall_timeout)
+
+    def _stale_bots(self) -> list[int]:
+        if self.polling is None or not self.polling.running:
+            return []
+        return [bot_id for bot_id, age in self.polling.poll_age().items() if age > self.stall_timeout]
+
+    def is_healthy(self) -> bool:
+        return self.lag.average < self.lag.threshold and not self._stale_bots()
+
+    def is_ready(self) -> bool:
+        if self.polling is not None and not self.polling.running:
+            return False
+        return self.ready and self.is_healthy()
+
+    def snapshot(self) -> dict[str, Any]:
+        now = time.monotonic()
+        poll_age = self.polling.poll_age() if self.polling is not None else {}
+        bots = {}
+        for inflight in self.inflights:
+            bot_id = inflight.bot.id
+            last_processed = inflight.last_processed_at
+            bots[str(bot_id)] = {
+                "in_flight": inflight.count,
+                "processed": inflight.processed,
+                "ledger_pending": inflight.ledger.pending_count,
+                "since_last_update": round(now - last_processed, 1) if last_processed is not None else None,
+                "since_last_poll": round(poll_age[bot_id], 1) if bot_id in poll_age else None,
+            }
+
+        snapshot: dict[str, Any] = {
+            "healthy": self.is_healthy(),
+            "ready": self.is_ready(),
+            "loop_lag": self.lag.stats(),
+            "bots": bots,
+            "outbound": self.scheduler.stats(),
+        }
+        isolation = self.dp.fsm.events_isolation
+        if hasattr(isolation, "stats"):
+            snapshot["isolation"] = isolation.stats()
+        storage = self.dp.fsm.storage
+        if hasattr(storage, "stats"):
+            snapshot["fsm_storage"] = storage.stats()
+        if self.polling is not None:
+            snapshot["polling_restarts"] = self.polling.restarts
+        for name in ("jobs", "throttling", "deadline", "callback_ack"):
+            component = self.dp.workflow_data.get(name)
+            if component is not None:
+                snapshot[name] = component.stats()
+        return snapshot
+
+    async def _health(self, request: web.Request) -> web.Response:
+        return web.json_response(self.snapshot(), status=200 if self.is_healthy() else 503)
+
+    async def _ready(self, request: web.Request) -> web.Response:
+        return web.json_response({"ready": self.is_ready()}, status=200 if self.is_ready() else 503)
+
+    async def start(self, host: str, port: int) -> None:
+        self._tasks = [
+            asyncio.create_task(self.lag.run(), name="watchdog:loop-lag"),
+            asyncio.create_task(self._watch(), name="watchdog:polling"),
+        ]
+        self._address = (host, port)
+
+    async def _serve(self) -> None:
+        if self._address is None or not self._address[1] or self._runner is not None:
+            return
+
+        host, port = self._address
+        app = web.Application()
+        app.router.add_get("/health", self._health)
+        app.router.add_get("/ready", self._ready)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host=host, port=port).start()
+        logger.info("Health endpoint listening on http://%s:%s/health", host, port)
+
+    async def _close_http(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._close_http()
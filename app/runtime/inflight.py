@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import time
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+from app.runtime.ledger import UpdateLedger, replay_updates
+
+logger = logging.getLogger(__name__)
+
+
+class InFlightUpdates:
+    def __init__(self, bot: Bot, dp: Dispatcher, ledger: UpdateLedger, limit: int):
+        self.bot = bot
+        self.dp = dp
+        self.ledger = ledger
+        self._slots = asyncio.Semaphore(limit)
+        self._tasks: dict[asyncio.Task, int] = {}
+        self.processed = 0
+        self.last_processed_at: float | None = None
+
+    @property
+    def count(self) -> int:
+        return len(self._tasks)
+
+    async def submit(self, update: Update) -> None:
+        # апдейт фиксируется в журнале до того, как Telegram получит подтверждение
+        if not self.ledger.receive(update):
+            logger.info("Skipping duplicate update %s", update.update_id)
+            return
+
+        received_at = time.monotonic()
+        await self._slots.acquire()
+        task = asyncio.create_task(self._process(update, received_at))
+        self._tasks[task] = update.update_id
+        task.add_done_callback(self._forget)
+
+    def _forget(self, task: asyncio.Task) -> None:
+        self._tasks.pop(task, None)
+
+    async def _process(self, update: Update, received_at: float) -> None:
+        try:
+            try:
+                await self.dp.feed_update(self.bot, update, dispatcher=self.dp, received_at=received_at)
+            except Exception:
+                logger.exception("Failed to process update %s", update.update_id)
+            # отменённый при остановке апдейт не отмечается и будет повторён после рестарта
+            self.ledger.complete(update.update_id)
+            self.processed += 1
+            self.last_processed_at = time.monotonic()
+        finally:
+            self._slots.release()
+
+    async def replay(self) -> None:
+        for update in replay_updates(self.ledger, self.bot):
+            await self.submit(update)
+
+    async def drain(self, timeout: float) -> list[int]:
+        if not self._tasks:
+            return []
+
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        abandoned = sorted(self._tasks[task] for task in pending if task in self._tasks)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        return abandoned
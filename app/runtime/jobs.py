@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+JobFunc = Callable[[], Awaitable[Any]]
+
+_CRON_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+
+class Interval:
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+
+    def next_delay(self, now: datetime) -> float:
+        return self.seconds
+
+    def __repr__(self) -> str:
+        return f"every {self.seconds:g}s"
+
+
+def _parse_cron_field(raw: str, low: int, high: int) -> frozenset[int]:
+    values: set[int] = set()
+    for part in raw.split(","):
+        expr, _, step_raw = part.partition("/")
+        step = int(step_raw) if step_raw else 1
+        if expr == "*":
+            start, end = low, high
+        elif "-" in expr:
+            start, end = (int(item) for item in expr.split("-", 1))
+        else:
+            start = int(expr)
+            end = high if step_raw else start
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"Invalid cron field: {raw}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+# Пятипольный cron по локальному времени: минута, час, день месяца, месяц, день недели (0 — воскресенье)
+class Cron:
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            _parse_cron_field(raw, low, high) for raw, (low, high) in zip(fields, _CRON_RANGES)
+        )
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = moment.isoweekday() % 7 in self.weekdays
+        # как в crontab: если заданы и день месяца, и день недели, достаточно совпадения любого
+        if not self._any_day and not self._any_weekday:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_fire(self, now: datetime) -> datetime:
+        moment = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 4)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+    def next_delay(self, now: datetime) -> float:
+        return (self.next_fire(now) - now).total_seconds()
+
+    def __repr__(self) -> str:
+        return f"cron {self.expression!r}"
+
+
+Trigger = Interval | Cron
+
+
+@dataclass
+class Job:
+    name: str
+    func: JobFunc
+    trigger: Trigger
+    jitter: float = 0.0
+    max_instances: int = 1
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    running: int = 0
+    last_duration: float | None = None
+    total_duration: float = 0.0
+    last_error: str | None = None
+    _tasks: set[asyncio.Task] = field(default_factory=set, repr=False)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "trigger": repr(self.trigger),
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "running": self.running,
+            "last_duration": self.last_duration,
+            "avg_duration": self.total_duration / self.runs if self.runs else None,
+            "last_error": self.last_error,
+        }
+
+
+# Фоновые задачи внутри процесса бота: запускаются хуком startup, отменяются на shutdown
+class JobScheduler:
+    def __init__(self) -> None:
+        self.jobs: dict[str, Job] = {}
+        self._loops: list[asyncio.Task] = []
+
+    def add(
+        self,
+        name: str,
+        func: JobFunc,
+        trigger: Trigger,
+        jitter: float = 0.0,
+        max_instances: int = 1,
+    ) -> Job:
+        if name in self.jobs:
+            raise ValueError(f"Job {name} is already registered")
+        job = self.jobs[name] = Job(name, func, trigger, jitter=jitter, max_instances=max_instances)
+        return job
+
+    def every(self, seconds: float, name: str, func: JobFunc, **kwargs: Any) -> Job:
+        return self.add(name, func, Interval(seconds), **kwargs)
+
+    def cron(self, expression: str, name: str, func: JobFunc, **kwargs: Any) -> Job:
+        return self.add(name, func, Cron(expression), **kwargs)
+
+    async def _execute(self, job: Job) -> None:
+        job.running += 1
+        started = time.perf_counter()
+        try:
+            await job.func()
+        except Exception as exc:
+            job.failures += 1
+            job.last_error = f"{exc.__class__.__name__}: {exc}"
+            logger.exception("Job %s failed", job.name)
+        finally:
+            job.running -= 1
+        # прерванный на shutdown запуск в метрики не попадает
+        job.runs += 1
+        job.last_duration = time.perf_counter() - started
+        job.total_duration += job.last_duration
+
+    async def _loop(self, job: Job) -> None:
+        while True:
+            delay = job.trigger.next_delay(datetime.now()) + random.uniform(0, job.jitter)
+            await asyncio.sleep(delay)
+
+            # прошлый запуск ещё идёт — пропускаем, а не копим очередь запусков
+            if job.running >= job.max_instances:
+                job.skipped += 1
+                logger.warning("Job %s skipped: %s runs still active", job.name, job.running)
+                continue
+
+            task = asyncio.create_task(self._execute(job), name=f"job:{job.name}")
+            job._tasks.add(task)
+            task.add_done_callback(job._tasks.discard)
+
+    async def start(self) -> None:
+        if self._loops:
+            return
+        for job in self.jobs.values():
+            self._loops.append(asyncio.create_task(self._loop(job), name=f"job-loop:{job.name}"))
+        logger.info(
+            "Job scheduler started: %s",
+            ", ".join(f"{job.name} ({job.trigger!r})" for job in self.jobs.values()),
+        )
+
+    async def stop(self) -> None:
+        tasks = list(self._loops)
+        for job in self.jobs.values():
+            tasks.extend(job._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._loops.clear()
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {name: job.stats() for name, job in self.jobs.items()}
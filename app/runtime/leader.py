@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+STANDBY_POLL_INTERVAL = 0.2
+
+_CREATE_TABLE = "CREATE TABLE IF NOT EXISTS lease (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)"
+# Захват или продление: строка переписывается, только если она наша или срок аренды истёк
+_UPSERT = (
+    "INSERT INTO lease (name, owner, expires) VALUES (?, ?, ?) "
+    "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires = excluded.expires "
+    "WHERE lease.owner = excluded.owner OR lease.expires < ?"
+)
+
+
+class SqliteLease:
+    def __init__(self, path: Path, name: str = "polling", ttl: float = 3.0):
+        self.path = path
+        self.name = name
+        self.ttl = ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lost = False
+        self._renew_interval = ttl / 3
+        # ожидание блокировки БД: попытка продления укладывается в интервал до следующей
+        self._db_timeout = ttl / 6
+        self._renewed_at = 0.0
+        self._keeper: asyncio.Task | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        return sqlite3.connect(self.path, timeout=self._db_timeout, isolation_level=None)
+
+    def _try_acquire_sync(self) -> bool:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(_CREATE_TABLE)
+            conn.execute(_UPSERT, (self.name, self.owner, now + self.ttl, now))
+            row = conn.execute("SELECT owner FROM lease WHERE name = ?", (self.name,)).fetchone()
+        return row is not None and row[0] == self.owner
+
+    def _release_sync(self) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(_CREATE_TABLE)
+            conn.execute("UPDATE lease SET expires = 0 WHERE name = ? AND owner = ?", (self.name, self.owner))
+
+    async def try_acquire(self) -> bool:
+        # срок аренды отсчитывается от момента до запроса: expires в БД не может быть раньше
+        started = time.monotonic()
+        try:
+            acquired = await asyncio.to_thread(self._try_acquire_sync)
+        except sqlite3.Error:
+            logger.exception("Lease %s: database error", self.name)
+            return False
+        if acquired:
+            self._renewed_at = started
+        return acquired
+
+    async def wait_for_leadership(self) -> None:
+        logger.info("Lease %s: standing by as %s", self.name, self.owner)
+        while not await self.try_acquire():
+            await asyncio.sleep(STANDBY_POLL_INTERVAL)
+        logger.info("Lease %s: acquired by %s", self.name, self.owner)
+
+    async def keep(self, on_lost: Callable[[], None]) -> None:
+        while True:
+            await asyncio.sleep(self._renew_interval)
+            started = time.monotonic()
+            try:
+                held = await asyncio.to_thread(self._try_acquire_sync)
+            except sqlite3.Error:
+                logger.exception("Lease %s: failed to renew", self.name)
+                # при сбое БД держим лидерство, только если и следующая попытка с ожиданием блокировки
+                # успеет завершиться до истечения аренды — иначе другие её уже могут захватить
+                elapsed = time.monotonic() - self._renewed_at
+                if elapsed + self._renew_interval + self._db_timeout < self.ttl:
+                    continue
+                held = False
+
+            if held:
+                self._renewed_at = started
+                continue
+
+            self.lost = True
+            logger.error("Lease %s: lost by %s, stopping", self.name, self.owner)
+            on_lost()
+            return
+
+    def start_keeping(self, on_lost: Callable[[], None]) -> None:
+        # аренда продлевается до release(): на время дренажа при остановке тоже
+        if self._keeper is None:
+            self._keeper = asyncio.create_task(self.keep(on_lost), name=f"lease:{self.name}")
+
+    async def release(self) -> None:
+        if self._keeper is not None:
+            self._keeper.cancel()
+            await asyncio.gather(self._keeper, return_exceptions=True)
+            self._keeper = None
+        if self.lost:
+            return
+        try:
+            await asyncio.to_thread(self._release_sync)
+        except sqlite3.Error:
+            logger.exception("Lease %s: failed to release", self.name)
+        else:
+            logger.info("Lease %s: released by %s", self.name, self.owner)
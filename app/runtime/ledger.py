@@ -0,0 +1,146 @@
+import logging
+import os
+from collections import deque
+from pathlib import Path
+
+from aiogram import Bot
+from aiogram.types import Update
+
+logger = logging.getLogger(__name__)
+
+# Формат журнала (по строке на запись):
+#   O <offset>        — следующий update_id, который нужно запросить у Telegram
+#   F <floor>         — все update_id ниже уже обработаны и вытеснены из окна
+#   R <id> <json>     — апдейт принят в обработку
+#   D <update_id>     — апдейт обработан
+_OFFSET = "O"
+_FLOOR = "F"
+_RECEIVED = "R"
+_DONE = "D"
+
+
+class UpdateLedger:
+    def __init__(self, path: Path, window: int = 1000):
+        self.path = path
+        self.window = window
+        self.offset: int | None = None
+        self._floor = 0
+        self._pending: dict[int, str] = {}
+        self._done: set[int] = set()
+        self._done_order: deque[int] = deque()
+        self._file = None
+        self._records = 0
+
+    def load(self) -> list[str]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            with self.path.open("r", encoding="utf-8") as file:
+                for line in file:
+                    self._apply(line.rstrip("\n"))
+
+        self._compact()
+        replay = [self._pending[update_id] for update_id in sorted(self._pending)]
+        # незавершённые апдейты снова пройдут через receive() при повторной обработке
+        self._pending.clear()
+        if replay:
+            logger.info("Update ledger: %s unfinished updates to replay", len(replay))
+        return replay
+
+    def _apply(self, line: str) -> None:
+        kind, _, payload = line.partition(" ")
+        try:
+            if kind == _OFFSET:
+                self.offset = max(self.offset or 0, int(payload))
+            elif kind == _FLOOR:
+                self._floor = max(self._floor, int(payload))
+            elif kind == _RECEIVED:
+                raw_id, _, raw_update = payload.partition(" ")
+                update_id = int(raw_id)
+                if update_id >= self._floor and update_id not in self._done:
+                    self._pending[update_id] = raw_update
+                self._advance_offset(update_id)
+            elif kind == _DONE:
+                update_id = int(payload)
+                self._pending.pop(update_id, None)
+                self._remember_done(update_id)
+        except ValueError:
+            logger.warning("Update ledger: skipping corrupted record %r", line[:80])
+
+    def _advance_offset(self, update_id: int) -> None:
+        if self.offset is None or update_id >= self.offset:
+            self.offset = update_id + 1
+
+    def _remember_done(self, update_id: int) -> None:
+        if update_id in self._done:
+            return
+        self._done.add(update_id)
+        self._done_order.append(update_id)
+        while len(self._done_order) > self.window:
+            evicted = self._done_order.popleft()
+            self._done.discard(evicted)
+            # окно вытесняется в порядке завершения, а не id: пол не должен обогнать ещё незавершённый
+            # медленный апдейт, иначе его R-запись отбросится при перезапуске и он не будет переигран
+            floor = evicted + 1
+            if self._pending:
+                floor = min(floor, min(self._pending))
+            self._floor = max(self._floor, floor)
+
+    def _write(self, kind: str, payload: str) -> None:
+        if self._file is None:
+            self._file = self.path.open("a", encoding="utf-8")
+        self._file.write(f"{kind} {payload}\n")
+        self._file.flush()
+        self._records += 1
+        if self._records > self.window * 4:
+            self._compact()
+
+    def _compact(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as file:
+            if self.offset is not None:
+                file.write(f"{_OFFSET} {self.offset}\n")
+            file.write(f"{_FLOOR} {self._floor}\n")
+            for update_id in self._done_order:
+                file.write(f"{_DONE} {update_id}\n")
+            for update_id, raw_update in self._pending.items():
+                file.write(f"{_RECEIVED} {update_id} {raw_update}\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.path)
+        self._records = len(self._done_order) + len(self._pending) + 2
+
+    def is_duplicate(self, update_id: int) -> bool:
+        return update_id in self._pending or update_id in self._done or update_id < self._floor
+
+    def receive(self, update: Update) -> bool:
+        if self.is_duplicate(update.update_id):
+            return False
+        raw_update = update.model_dump_json(exclude_unset=True)
+        self._pending[update.update_id] = raw_update
+        self._advance_offset(update.update_id)
+        self._write(_RECEIVED, f"{update.update_id} {raw_update}")
+        return True
+
+    def complete(self, update_id: int) -> None:
+        if self._pending.pop(update_id, None) is None:
+            return
+        self._remember_done(update_id)
+        self._write(_DONE, str(update_id))
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def close(self) -> None:
+        self._compact()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def replay_updates(ledger: UpdateLedger, bot: Bot) -> list[Update]:
+    return [Update.model_validate_json(raw, context={"bot": bot}) for raw in ledger.load()]
@@ -0,0 +1,226 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from enum import IntEnum
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMediaGroup, TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+
+from app.config.brands import ADMIN_CHAT_IDS, CHANNEL_CHAT_IDS
+
+logger = logging.getLogger(__name__)
+
+# Лимиты Telegram: ~30 сообщений/сек на бота, ~1/сек в личный чат, 20/мин в группу или канал
+GLOBAL_RATE = 30.0
+GLOBAL_BURST = 30
+CHAT_RATE = 1.0
+CHAT_BURST = 3
+GROUP_RATE = 20 / 60
+GROUP_BURST = 3
+MAX_RETRIES = 3
+MAX_TRACKED_CHATS = 10_000
+
+
+class Lane(IntEnum):
+    USER = 0
+    ADMIN = 1
+    CHANNEL = 2
+
+
+def lane_for_chat(chat_id: int | str) -> Lane:
+    if chat_id in ADMIN_CHAT_IDS:
+        return Lane.ADMIN
+    if chat_id in CHANNEL_CHAT_IDS or not isinstance(chat_id, int) or chat_id < 0:
+        return Lane.CHANNEL
+    return Lane.USER
+
+
+def _request_cost(method: TelegramMethod) -> int:
+    if isinstance(method, SendMediaGroup):
+        return max(len(method.media), 1)
+    return 1
+
+
+# GCRA: хранит только теоретическое время следующей отправки в чат
+class _ChatBucket:
+    __slots__ = ("interval", "tolerance", "tat")
+
+    def __init__(self, rate: float, burst: int):
+        self.interval = 1 / rate
+        self.tolerance = self.interval * (burst - 1)
+        self.tat = 0.0
+
+    def reserve(self, cost: int = 1) -> float:
+        now = time.monotonic()
+        tat = max(self.tat, now)
+        delay = max(0.0, tat - self.tolerance - now)
+        self.tat = tat + self.interval * cost
+        return delay
+
+    def pause(self, seconds: float) -> None:
+        self.tat = max(self.tat, time.monotonic() + seconds + self.tolerance)
+
+    def is_idle(self, now: float) -> bool:
+        return self.tat <= now
+
+
+# Глобальный token bucket: токены выдаются ожидающим в порядке приоритета полосы
+class _PriorityLimiter:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._waiters: list[tuple[int, int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._pump_task: asyncio.Task | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, lane: Lane, cost: int = 1) -> None:
+        cost = min(cost, self.burst)
+        self._refill()
+        if not self._waiters and self._tokens >= cost:
+            self._tokens -= cost
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(lane), next(self._counter), cost, future))
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+        await future
+
+    async def _pump(self) -> None:
+        while self._waiters:
+            _, _, cost, future = self._waiters[0]
+            if future.cancelled():
+                heapq.heappop(self._waiters)
+                continue
+
+            self._refill()
+            if self._tokens >= cost:
+                heapq.heappop(self._waiters)
+                self._tokens -= cost
+                future.set_result(None)
+                continue
+
+            await asyncio.sleep((cost - self._tokens) / self.rate)
+
+
+# Один планировщик на процесс: сессия общая для всех ботов, но лимиты Telegram считаются по каждому боту
+class OutboundScheduler(BaseRequestMiddleware):
+    def __init__(
+        self,
+        global_rate: float = GLOBAL_RATE,
+        global_burst: int = GLOBAL_BURST,
+        max_retries: int = MAX_RETRIES,
+    ):
+        self.max_retries = max_retries
+        self.global_rate = global_rate
+        self.global_burst = global_burst
+        self._globals: dict[int, _PriorityLimiter] = {}
+        self._chats: dict[tuple[int, int | str], _ChatBucket] = {}
+        self.in_flight = 0
+        self.retries = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(limiter.queue_depth for limiter in self._globals.values())
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "retries": self.retries,
+            "tracked_chats": len(self._chats),
+        }
+
+    async def drain(self, timeout: float) -> int:
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.in_flight
+
+    def _global_limiter(self, bot_id: int) -> _PriorityLimiter:
+        limiter = self._globals.get(bot_id)
+        if limiter is None:
+            limiter = self._globals[bot_id] = _PriorityLimiter(self.global_rate, self.global_burst)
+        return limiter
+
+    def _chat_bucket(self, bot_id: int, chat_id: int | str) -> _ChatBucket:
+        key = (bot_id, chat_id)
+        bucket = self._chats.get(key)
+        if bucket is None:
+            if len(self._chats) >= MAX_TRACKED_CHATS:
+                self._prune_chats()
+            if isinstance(chat_id, int) and chat_id > 0:
+                bucket = _ChatBucket(CHAT_RATE, CHAT_BURST)
+            else:
+                bucket = _ChatBucket(GROUP_RATE, GROUP_BURST)
+            self._chats[key] = bucket
+        return bucket
+
+    def _prune_chats(self) -> None:
+        now = time.monotonic()
+        for key in [key for key, bucket in self._chats.items() if bucket.is_idle(now)]:
+            del self._chats[key]
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return await make_request(bot, method)
+
+        lane = lane_for_chat(chat_id)
+        cost = _request_cost(method)
+        bucket = self._chat_bucket(bot.id, chat_id)
+        limiter = self._global_limiter(bot.id)
+
+        attempt = 0
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            while True:
+                # альбом расходует глобальный бюджет по числу фото, но в чат уходит одним запросом
+                delay = bucket.reserve()
+                if delay:
+                    await asyncio.sleep(delay)
+                await limiter.acquire(lane, cost)
+
+                try:
+                    return await make_request(bot, method)
+                except TelegramRetryAfter as exc:
+                    attempt += 1
+                    if attempt > self.max_retries:
+                        raise
+                    self.retries += 1
+                    logger.warning(
+                        "Flood control on %s in chat %s, retry in %s s",
+                        type(method).__name__,
+                        chat_id,
+                        exc.retry_after,
+                    )
+                    bucket.pause(exc.retry_after)
+        finally:
+            self.in_flight -= 1
+            if not self.in_flight:
+                self._idle.set()
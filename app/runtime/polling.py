@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import time
+
+from aiogram import Dispatcher
+
+from app.runtime.inflight import InFlightUpdates
+from app.runtime.leader import SqliteLease
+from app.runtime.outbound import OutboundScheduler
+from app.runtime.shutdown import graceful_shutdown, install_stop_handlers
+
+logger = logging.getLogger(__name__)
+
+POLLING_TIMEOUT = 30
+
+
+class LedgerPolling:
+    def __init__(
+        self,
+        dp: Dispatcher,
+        inflights: list[InFlightUpdates],
+        scheduler: OutboundScheduler,
+        shutdown_timeout: float,
+        lease: SqliteLease | None = None,
+    ):
+        self.dp = dp
+        self.inflights = inflights
+        self.scheduler = scheduler
+        self.shutdown_timeout = shutdown_timeout
+        self.lease = lease
+        self._listeners: dict[int, asyncio.Task] = {}
+        self._last_poll: dict[int, float] = {}
+        # боты, чей слушатель ждёт свободного слота в submit: это backpressure, а не зависший long polling
+        self._submitting: set[int] = set()
+        self._stopped = asyncio.Event()
+        self.restarts = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._listeners) and not self._stopped.is_set()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        for listener in self._listeners.values():
+            listener.cancel()
+
+    async def _listen(self, inflight: InFlightUpdates) -> None:
+        allowed_updates = self.dp.resolve_used_update_types()
+        while True:
+            try:
+                updates = await inflight.bot.get_updates(
+                    offset=inflight.ledger.offset,
+                    timeout=POLLING_TIMEOUT,
+                    allowed_updates=allowed_updates,
+                )
+            except Exception:
+                logger.exception("getUpdates failed for bot %s, retrying", inflight.bot.id)
+                await asyncio.sleep(1)
+                continue
+
+            self._last_poll[inflight.bot.id] = time.monotonic()
+            # апдейты пачки уже за offset: отмена посреди цикла потеряла бы их до перезапуска
+            self._submitting.add(inflight.bot.id)
+            try:
+                for update in updates:
+                    await inflight.submit(update)
+                    self._last_poll[inflight.bot.id] = time.monotonic()
+            finally:
+                self._submitting.discard(inflight.bot.id)
+
+    def _start_listener(self, inflight: InFlightUpdates) -> None:
+        self._last_poll[inflight.bot.id] = time.monotonic()
+        self._listeners[inflight.bot.id] = asyncio.create_task(self._listen(inflight))
+
+    def poll_age(self) -> dict[int, float]:
+        now = time.monotonic()
+        return {bot_id: now - last_poll for bot_id, last_poll in self._last_poll.items()}
+
+    def restart_stale(self, max_age: float) -> list[int]:
+        # long polling возвращается не реже чем раз в POLLING_TIMEOUT; дольше — соединение зависло
+        if not self.running:
+            return []
+        stale = [
+            bot_id for bot_id, age in self.poll_age().items() if age > max_age and bot_id not in self._submitting
+        ]
+        for inflight in self.inflights:
+            if inflight.bot.id in stale:
+                logger.warning("Polling for bot %s is stalled, restarting listener", inflight.bot.id)
+                self._listeners[inflight.bot.id].cancel()
+                self._start_listener(inflight)
+                self.restarts += 1
+        return stale
+
+    async def run(self) -> None:
+        if self.lease is not None:
+            # резервный экземпляр ждёт аренду; журнал читается только после её получения
+            await self.lease.wait_for_leadership()
+
+        bots = [inflight.bot for inflight in self.inflights]
+        for bot in bots:
+            await bot.delete_webhook(drop_pending_updates=False)
+        await self.dp.emit_startup(bot=bots[-1], dispatcher=self.dp, bots=bots)
+
+        for inflight in self.inflights:
+            await inflight.replay()
+            logger.info("Polling bot %s resumed from offset %s", inflight.bot.id, inflight.ledger.offset)
+
+        for inflight in self.inflights:
+            self._start_listener(inflight)
+        install_stop_handlers(self.stop)
+
+        if self.lease is not None:
+            self.lease.start_keeping(self.stop)
+
+        try:
+            await self._stopped.wait()
+            logger.info("Polling stopped")
+        finally:
+            self.stop()
+            await asyncio.gather(*self._listeners.values(), return_exceptions=True)
+            # аренда продлевается, пока идёт дренаж: её снимает graceful_shutdown после закрытия журнала
+            await graceful_shutdown(
+                self.dp,
+                self.inflights,
+                self.scheduler,
+                self.shutdown_timeout,
+                lease=self.lease,
+            )
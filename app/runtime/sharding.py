@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import multiprocessing as mp
+import time
+from multiprocessing.process import BaseProcess
+from multiprocessing.queues import Queue
+from typing import Callable
+
+from aiogram import Dispatcher
+from aiogram.types import Update
+from aiogram.types.update import UpdateTypeLookupError
+
+from app.config import MAX_PENDING_UPDATES, SHUTDOWN_TIMEOUT
+from app.factory import configure_logging, create_bot, create_session, start_cost_form
+from app.runtime.outbound import GLOBAL_BURST, GLOBAL_RATE, OutboundScheduler
+from app.runtime.shutdown import install_stop_handlers
+
+logger = logging.getLogger(__name__)
+
+DispatcherFactory = Callable[[], Dispatcher]
+
+POLLING_TIMEOUT = 30
+_STOP = None
+
+
+def extract_chat_id(update: Update) -> int | None:
+    try:
+        event = update.event
+    except UpdateTypeLookupError:
+        return None
+
+    chat = getattr(event, "chat", None)
+    if chat is not None:
+        return chat.id
+
+    message = getattr(event, "message", None)
+    if message is not None and getattr(message, "chat", None) is not None:
+        return message.chat.id
+
+    user = getattr(event, "from_user", None)
+    if user is not None:
+        return user.id
+    return None
+
+
+def shard_for_update(update: Update, workers: int) -> int:
+    chat_id = extract_chat_id(update)
+    if chat_id is None:
+        return update.update_id % workers
+    return abs(chat_id) % workers
+
+
+async def _worker_loop(index: int, workers: int, queue: Queue, build_dispatcher: DispatcherFactory) -> None:
+    # глобальный лимит Telegram общий для бота, поэтому делим его между воркерами
+    scheduler = OutboundScheduler(
+        global_rate=GLOBAL_RATE / workers,
+        global_burst=max(GLOBAL_BURST // workers, 1),
+    )
+    bot = create_bot(session=create_session(scheduler))
+    dp = build_dispatcher()
+    loop = asyncio.get_running_loop()
+
+    pending = asyncio.Semaphore(MAX_PENDING_UPDATES)
+    tasks: set[asyncio.Task] = set()
+
+    async def process(update: Update, received_at: float) -> None:
+        try:
+            await dp.feed_update(bot, update, dispatcher=dp, received_at=received_at)
+        except Exception:
+            logger.exception("Worker %s failed to process update %s", index, update.update_id)
+        finally:
+            pending.release()
+
+    await dp.emit_startup(bot=bot, dispatcher=dp)
+    # SIGTERM приходит всей группе процессов: воркер дочитывает очередь до своего _STOP и дренируется
+    install_stop_handlers(lambda: queue.put(_STOP))
+    logger.info("Worker %s started", index)
+    try:
+        while True:
+            raw_update = await loop.run_in_executor(None, queue.get)
+            if raw_update is _STOP:
+                break
+
+            update = Update.model_validate_json(raw_update, context={"bot": bot})
+            # порядок внутри чата гарантирует events_isolation диспетчера
+            received_at = time.monotonic()
+            await pending.acquire()
+            task = asyncio.create_task(process(update, received_at))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        deadline = loop.time() + SHUTDOWN_TIMEOUT
+        if tasks:
+            logger.info("Worker %s: waiting up to %s s for %s running updates", index, SHUTDOWN_TIMEOUT, len(tasks))
+            _, abandoned = await asyncio.wait(set(tasks), timeout=SHUTDOWN_TIMEOUT)
+            if abandoned:
+                logger.warning("Worker %s: abandoned %s running updates", index, len(abandoned))
+                for task in abandoned:
+                    task.cancel()
+                await asyncio.gather(*abandoned, return_exceptions=True)
+        abandoned_sends = await scheduler.drain(max(deadline - loop.time(), 0.0))
+        if abandoned_sends:
+            logger.warning("Worker %s: abandoned %s outbound requests", index, abandoned_sends)
+    finally:
+        # shutdown-хуки диспетчера сбрасывают буфер FSM-хранилища и закрывают БД
+        await dp.emit_shutdown(bot=bot, dispatcher=dp)
+        await bot.session.close()
+        logger.info("Worker %s stopped", index)
+
+
+def _worker_main(index: int, workers: int, queue: Queue, build_dispatcher: DispatcherFactory) -> None:
+    configure_logging()
+    try:
+        asyncio.run(_worker_loop(index, workers, queue, build_dispatcher))
+    except KeyboardInterrupt:
+        pass
+
+
+class ShardSupervisor:
+    def __init__(self, build_dispatcher: DispatcherFactory, workers: int):
+        if workers < 1:
+            raise ValueError("workers must be positive")
+        self.build_dispatcher = build_dispatcher
+        self.workers = workers
+        self._ctx = mp.get_context("spawn")
+        self._queues: list[Queue] = [self._ctx.Queue() for _ in range(workers)]
+        self._processes: list[BaseProcess | None] = [None] * workers
+
+    def _spawn(self, index: int) -> None:
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(index, self.workers, self._queues[index], self.build_dispatcher),
+            name=f"bot-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        self._processes[index] = process
+
+    def start_workers(self) -> None:
+        for index in range(self.workers):
+            self._spawn(index)
+
+    def _respawn_dead_workers(self) -> None:
+        for index, process in enumerate(self._processes):
+            if process is not None and not process.is_alive():
+                logger.warning("Worker %s exited with code %s, restarting", index, process.exitcode)
+                self._spawn(index)
+
+    def dispatch(self, update: Update) -> None:
+        index = shard_for_update(update, self.workers)
+        self._queues[index].put(update.model_dump_json(exclude_unset=True))
+
+    def stop_workers(self, timeout: float = SHUTDOWN_TIMEOUT + 5) -> None:
+        for queue in self._queues:
+            queue.put(_STOP)
+        # воркеры дренируются параллельно: общий срок на всех, а не timeout на каждого
+        deadline = time.monotonic() + timeout
+        for index, process in enumerate(self._processes):
+            if process is None:
+                continue
+            process.join(max(deadline - time.monotonic(), 0.0))
+            if process.is_alive():
+                logger.warning("Worker %s did not stop in %s s, terminating", index, timeout)
+                process.terminate()
+
+    async def poll(self) -> None:
+        bot = create_bot()
+        allowed_updates: list[str] = self.build_dispatcher().resolve_used_update_types()
+        offset: int | None = None
+
+        # остановка по сигналу прерывает getUpdates; воркеры дренируются в stop_workers
+        install_stop_handlers(asyncio.current_task().cancel)
+        await bot.delete_webhook(drop_pending_updates=False)
+        # веб-форма калькулятора обслуживается супервизором: воркеры не слушают порты
+        form_runner = await start_cost_form()
+        try:
+            while True:
+                self._respawn_dead_workers()
+                try:
+                    updates = await bot.get_updates(
+                        offset=offset,
+                        timeout=POLLING_TIMEOUT,
+                        allowed_updates=allowed_updates,
+                    )
+                except Exception:
+                    logger.exception("getUpdates failed, retrying")
+                    await asyncio.sleep(1)
+                    continue
+
+                for update in updates:
+                    self.dispatch(update)
+                    offset = update.update_id + 1
+        except asyncio.CancelledError:
+            logger.info("Supervisor stopping")
+            # подтверждаем offset, иначе Telegram снова отдаст уже разосланную воркерам пачку
+            if offset is not None:
+                try:
+                    await bot.get_updates(offset=offset, timeout=0, limit=1)
+                except Exception:
+                    logger.exception("Failed to confirm offset %s", offset)
+        finally:
+            if form_runner is not None:
+                await form_runner.cleanup()
+            await bot.session.close()
+
+
+def run_supervisor(build_dispatcher: DispatcherFactory, workers: int) -> None:
+    supervisor = ShardSupervisor(build_dispatcher, workers)
+    supervisor.start_workers()
+    logger.info("Supervisor started %s workers", workers)
+    try:
+        asyncio.run(supervisor.poll())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        supervisor.stop_workers()
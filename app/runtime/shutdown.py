@@ -0,0 +1,61 @@
+import asyncio
+import logging
+import signal
+from typing import Callable
+
+from aiogram import Dispatcher
+
+from app.runtime.inflight import InFlightUpdates
+from app.runtime.leader import SqliteLease
+from app.runtime.outbound import OutboundScheduler
+
+logger = logging.getLogger(__name__)
+
+
+def install_stop_handlers(stop: Callable[[], None]) -> None:
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop)
+
+
+async def graceful_shutdown(
+    dp: Dispatcher,
+    inflights: list[InFlightUpdates],
+    scheduler: OutboundScheduler,
+    timeout: float,
+    lease: SqliteLease | None = None,
+) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    bots = [inflight.bot for inflight in inflights]
+    running = sum(inflight.count for inflight in inflights)
+    logger.info("Shutdown: waiting up to %s s for %s running updates", timeout, running)
+
+    abandoned_updates = await asyncio.gather(*(inflight.drain(timeout) for inflight in inflights))
+    abandoned_sends = await scheduler.drain(max(deadline - loop.time(), 0.0))
+
+    # shutdown-хуки диспетчера сбрасывают буферы и закрывают БД
+    await dp.emit_shutdown(bot=bots[-1], dispatcher=dp, bots=bots)
+    if lease is not None and lease.lost:
+        # журнал уже читает новый лидер: финальное сжатие затёрло бы его записи
+        logger.error("Shutdown: lease was lost while draining, ledger is left as is")
+    else:
+        for inflight in inflights:
+            inflight.ledger.close()
+    if lease is not None:
+        await lease.release()
+    # сессия может быть общей для нескольких ботов
+    for session in {id(bot.session): bot.session for bot in bots}.values():
+        await session.close()
+
+    for bot, abandoned in zip(bots, abandoned_updates):
+        if abandoned:
+            logger.warning(
+                "Shutdown: bot %s abandoned %s updates %s, they stay in the ledger for replay",
+                bot.id,
+                len(abandoned),
+                abandoned,
+            )
+    if abandoned_sends:
+        logger.warning("Shutdown: abandoned %s outbound requests", abandoned_sends)
+    logger.info("Shutdown complete")
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from aiohttp import web
+
+from app.config import WEBAPP_HOST, WEBAPP_PORT, WEBHOOK_BASE_URL, WEBHOOK_SECRET
+from app.config.brands import BRANDS_BY_BOT_ID
+from app.runtime.inflight import InFlightUpdates
+from app.runtime.outbound import OutboundScheduler
+from app.runtime.shutdown import graceful_shutdown, install_stop_handlers
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+async def _set_webhook(bots: list[Bot], dispatcher: Dispatcher) -> None:
+    for bot in bots:
+        url = f"{WEBHOOK_BASE_URL}{BRANDS_BY_BOT_ID[bot.id].webhook_path}"
+        await bot.set_webhook(
+            url=url,
+            secret_token=WEBHOOK_SECRET,
+            allowed_updates=dispatcher.resolve_used_update_types(),
+        )
+        logger.info("Webhook for bot %s registered at %s", bot.id, url)
+
+
+def _update_handler(inflight: InFlightUpdates):
+    bot = inflight.bot
+
+    async def handle_update(request: web.Request) -> web.Response:
+        if WEBHOOK_SECRET and request.headers.get(SECRET_HEADER) != WEBHOOK_SECRET:
+            return web.Response(status=401)
+
+        payload = await request.json(loads=bot.session.json_loads)
+        update = Update.model_validate(payload, context={"bot": bot})
+        # Telegram получает 200 сразу, апдейт обрабатывается отдельной задачей
+        await inflight.submit(update)
+        return web.json_response({})
+
+    return handle_update
+
+
+def build_webhook_app(inflights: list[InFlightUpdates]) -> web.Application:
+    app = web.Application()
+    # у каждого бренда свой путь вебхука
+    for inflight in inflights:
+        app.router.add_post(BRANDS_BY_BOT_ID[inflight.bot.id].webhook_path, _update_handler(inflight))
+    return app
+
+
+async def run_webhook(
+    dp: Dispatcher,
+    inflights: list[InFlightUpdates],
+    scheduler: OutboundScheduler,
+    shutdown_timeout: float,
+) -> None:
+    bots = [inflight.bot for inflight in inflights]
+    dp.startup.register(_set_webhook)
+    await dp.emit_startup(bot=bots[-1], dispatcher=dp, bots=bots)
+    for inflight in inflights:
+        await inflight.replay()
+
+    runner = web.AppRunner(build_webhook_app(inflights))
+    await runner.setup()
+    site = web.TCPSite(runner, host=WEBAPP_HOST, port=WEBAPP_PORT)
+    await site.start()
+    logger.info("Webhook server listening on %s:%s for %s bots", WEBAPP_HOST, WEBAPP_PORT, len(bots))
+
+    stop = asyncio.Event()
+    install_stop_handlers(stop.set)
+    try:
+        await stop.wait()
+    finally:
+        # сначала перестаём принимать апдейты, затем дожидаемся уже принятых
+        await runner.cleanup()
+        await graceful_shutdown(dp, inflights, scheduler, shutdown_timeout)
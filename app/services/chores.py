@@ -0,0 +1,90 @@
+import asyncio
+import json
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from aiogram import Bot
+
+from app.config.brands import BRANDS, BRANDS_BY_BOT_ID, use_brand
+from app.services.dead_letters import DeadLetterStore
+from app.services.leads import LEAD_BRAND_PREFIX, LEAD_DATE_FORMAT, LEAD_DATE_PREFIX, LEAD_SEPARATOR
+from app.services.projects_service import load_projects, save_projects
+
+logger = logging.getLogger(__name__)
+
+
+
+async def compact_catalogs() -> None:
+    # каталог небольшой и меняется хендлерами в потоке event loop, поэтому и здесь без to_thread:
+    # так компакция не может перезаписать параллельное изменение администратора
+    for brand in BRANDS:
+        use_brand(brand)
+        if not brand.catalog_path.exists():
+            continue
+        projects = load_projects()
+        canonical = json.dumps(projects, ensure_ascii=False, indent=2)
+        if brand.catalog_path.read_text(encoding="utf-8") != canonical:
+            save_projects(projects)
+            logger.info("Catalog %s compacted", brand.catalog_path)
+
+
+def _rotate_file(path: Path, max_bytes: int, backups: int) -> bool:
+    if not path.exists() or path.stat().st_size < max_bytes:
+        return False
+    for index in range(backups - 1, 0, -1):
+        older = path.with_name(f"{path.name}.{index}")
+        if older.exists():
+            older.replace(path.with_name(f"{path.name}.{index + 1}"))
+    path.replace(path.with_name(f"{path.name}.1"))
+    return True
+
+
+async def rotate_file(path: Path, max_bytes: int, backups: int = 3) -> None:
+    if await asyncio.to_thread(_rotate_file, path, max_bytes, backups):
+        logger.info("Rotated %s", path)
+
+
+def _count_leads_since(path: Path, since: datetime, default_brand: str) -> Counter[str]:
+    # заявки до появления метки бренда относятся к основному боту
+    counts: Counter[str] = Counter()
+    for candidate in (path.with_name(f"{path.name}.1"), path):
+        if not candidate.exists():
+            continue
+        with candidate.open("r", encoding="utf-8") as file:
+            created_at, brand = None, default_brand
+            for line in file:
+                if line.startswith(LEAD_DATE_PREFIX):
+                    try:
+                        created_at = datetime.strptime(line.removeprefix(LEAD_DATE_PREFIX).strip(), LEAD_DATE_FORMAT)
+                    except ValueError:
+                        created_at = None
+                elif line.startswith(LEAD_BRAND_PREFIX):
+                    brand = line.removeprefix(LEAD_BRAND_PREFIX).strip()
+                elif line.rstrip("\n") == LEAD_SEPARATOR:
+                    if created_at is not None and created_at >= since:
+                        counts[brand] += 1
+                    created_at, brand = None, default_brand
+    return counts
+
+
+async def send_admin_digest(bots: list[Bot], leads_path: Path, dead_letters: DeadLetterStore) -> None:
+    leads = await asyncio.to_thread(
+        _count_leads_since, leads_path, datetime.now() - timedelta(days=1), BRANDS[0].name
+    )
+    entries = await dead_letters.list_entries()
+
+    for bot in bots:
+        brand = BRANDS_BY_BOT_ID[bot.id]
+        errors = sum(1 for entry in entries if not entry.replayed and entry.bot_id in (None, bot.id))
+        text = (
+            "📊 Сводка за сутки\n\n"
+            f"📞 Заявок на консультацию: {leads[brand.name]}\n"
+            f"⚠️ Необработанных ошибок: {errors}"
+        )
+        for admin_id in brand.admin_ids:
+            try:
+                await bot.send_message(admin_id, text)
+            except Exception:
+                logger.exception("Failed to send digest to admin %s of %s", admin_id, brand.name)
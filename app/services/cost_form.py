@@ -0,0 +1,202 @@
+import html
+import json
+import re
+from typing import Any
+
+from app.config.cost_steps import STEPS, StepConfig
+from app.services.tz_formatter import FIELD_LABELS
+from app.utils.selection import selection_version
+
+# Веб-форма калькулятора собирается из тех же STEPS, что и пошаговый сценарий в чате,
+# и отправляет все ответы одним web_app_data. Версия формы меняется вместе с шагами:
+# ответы из старой, закешированной клиентом формы не принимаются.
+FORM_VERSION = selection_version(
+    [f"{step.key}={','.join(option.key for option in step.options or [])}" for step in STEPS]
+)
+
+_STEP_NUMBER_RE = re.compile(r"^\d+/\d+\.\s*")
+
+_PAGE = """<!DOCTYPE html>
+<html lang="ru">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Виртуальный конфигуратор</title>
+<script src="https://telegram.org/js/telegram-web-app.js"></script>
+<style>
+body {{ font-family: -apple-system, system-ui, sans-serif; margin: 0; padding: 12px;
+  background: var(--tg-theme-bg-color, #fff); color: var(--tg-theme-text-color, #000); }}
+fieldset {{ border: 0; border-bottom: 1px solid var(--tg-theme-hint-color, #ccc); margin: 0; padding: 12px 0; }}
+legend {{ font-weight: 600; padding: 0 0 6px; }}
+label {{ display: block; padding: 4px 0; }}
+input[type=text], input[type=tel], input[type=email] {{ width: 100%; box-sizing: border-box; padding: 8px;
+  border: 1px solid var(--tg-theme-hint-color, #ccc); border-radius: 6px;
+  background: var(--tg-theme-secondary-bg-color, #fff); color: inherit; }}
+small {{ color: var(--tg-theme-hint-color, #888); }}
+.missing legend {{ color: #d33; }}
+</style>
+</head>
+<body>
+<form id="cost-form">
+{fields}
+</form>
+<script>
+const VERSION = "{version}";
+const STORAGE_KEY = "cost-form-" + VERSION;
+const tg = window.Telegram.WebApp;
+const form = document.getElementById("cost-form");
+
+function collect() {{
+  const answers = {{}};
+  const missing = [];
+  for (const fieldset of form.querySelectorAll("fieldset")) {{
+    const key = fieldset.dataset.step;
+    const kind = fieldset.dataset.kind;
+    let value;
+    if (kind === "text") {{
+      value = fieldset.querySelector("input").value.trim();
+    }} else if (kind === "single") {{
+      const checked = fieldset.querySelector("input:checked");
+      value = checked ? checked.value : "";
+    }} else {{
+      value = Array.from(fieldset.querySelectorAll("input:checked")).map((input) => input.value);
+    }}
+    fieldset.classList.toggle("missing", value.length === 0);
+    if (value.length === 0) missing.push(fieldset);
+    answers[key] = value;
+  }}
+  return {{ answers, missing }};
+}}
+
+function save() {{
+  localStorage.setItem(STORAGE_KEY, JSON.stringify(collect().answers));
+}}
+
+function restore() {{
+  const saved = JSON.parse(localStorage.getItem(STORAGE_KEY) || "{{}}");
+  for (const [key, value] of Object.entries(saved)) {{
+    for (const input of form.querySelectorAll(`[name="${{key}}"]`)) {{
+      if (input.type === "radio" || input.type === "checkbox") {{
+        input.checked = Array.isArray(value) ? value.includes(input.value) : input.value === value;
+      }} else {{
+        input.value = value;
+      }}
+    }}
+  }}
+  for (const fieldset of form.querySelectorAll("fieldset")) fieldset.classList.remove("missing");
+}}
+
+form.addEventListener("change", (event) => {{
+  const input = event.target;
+  if (input.type === "checkbox" && input.checked) {{
+    const fieldset = input.closest("fieldset");
+    const exclusive = fieldset.dataset.exclusive;
+    for (const other of fieldset.querySelectorAll("input")) {{
+      if (other !== input && (input.value === exclusive || other.value === exclusive)) other.checked = false;
+    }}
+  }}
+  save();
+}});
+form.addEventListener("input", save);
+
+restore();
+tg.ready();
+tg.expand();
+tg.MainButton.setText("Отправить");
+tg.MainButton.show();
+tg.MainButton.onClick(() => {{
+  const {{ answers, missing }} = collect();
+  if (missing.length) {{
+    missing[0].scrollIntoView({{ behavior: "smooth" }});
+    return;
+  }}
+  tg.sendData(JSON.stringify({{ v: VERSION, answers }}));
+}});
+</script>
+</body>
+</html>
+"""
+
+_INPUT_TYPES = {"phone": "tel", "email": "email"}
+
+
+def _question(step: StepConfig) -> str:
+    # тексты шагов — доверенная разметка из конфига, в форме убирается только нумерация «1/20.»
+    text = _STEP_NUMBER_RE.sub("", step.text)
+    if step.comment:
+        text = f"{text}<br><small>{html.escape(step.comment)}</small>"
+    return text
+
+
+def _render_step(step: StepConfig) -> str:
+    key = html.escape(step.key)
+    if not step.options:
+        input_type = _INPUT_TYPES.get(step.key, "text")
+        return (
+            f'<fieldset data-step="{key}" data-kind="text"><legend>{_question(step)}</legend>'
+            f'<input type="{input_type}" name="{key}"></fieldset>'
+        )
+
+    kind = "multi" if step.multi_select else "single"
+    input_type = "checkbox" if step.multi_select else "radio"
+    exclusive = f' data-exclusive="{html.escape(step.exclusive_option)}"' if step.exclusive_option else ""
+    options = "".join(
+        f'<label><input type="{input_type}" name="{key}" value="{html.escape(option.key)}"> '
+        f"{html.escape(option.label)}</label>"
+        for option in step.options
+    )
+    return (
+        f'<fieldset data-step="{key}" data-kind="{kind}"{exclusive}>'
+        f"<legend>{_question(step)}</legend>{options}</fieldset>"
+    )
+
+
+def render_cost_form() -> str:
+    return _PAGE.format(fields="\n".join(_render_step(step) for step in STEPS), version=FORM_VERSION)
+
+
+def _validate_answer(step: StepConfig, value: Any) -> tuple[Any, str | None]:
+    if not step.options:
+        if not isinstance(value, str) or not value.strip():
+            return None, "не заполнено"
+        value = value.strip()
+        if step.validator:
+            is_valid, error = step.validator(value)
+            if not is_valid:
+                return None, error or "некорректное значение"
+        return value, None
+
+    keys = [option.key for option in step.options]
+    if not step.multi_select:
+        if value not in keys:
+            return None, "выберите вариант"
+        return value, None
+
+    if not isinstance(value, list) or not value or not all(isinstance(item, str) for item in value) or not set(value) <= set(keys):
+        return None, "выберите хотя бы один вариант"
+    if step.exclusive_option in value and len(value) > 1:
+        label = next(option.label for option in step.options if option.key == step.exclusive_option)
+        return None, f"вариант «{label}» нельзя сочетать с другими"
+    return [key for key in keys if key in value], None
+
+
+def parse_cost_form(raw: str) -> tuple[dict[str, Any], list[str]]:
+    """Проверяет ответы формы теми же валидаторами, что и шаги в чате; возвращает ответы и ошибки."""
+    try:
+        payload = json.loads(raw)
+    except ValueError:
+        return {}, ["Не удалось прочитать данные формы."]
+    if not isinstance(payload, dict) or not isinstance(payload.get("answers"), dict):
+        return {}, ["Не удалось прочитать данные формы."]
+    if payload.get("v") != FORM_VERSION:
+        return {}, ["Форма устарела. Откройте её заново."]
+
+    answers: dict[str, Any] = {}
+    errors: list[str] = []
+    for step in STEPS:
+        value, error = _validate_answer(step, payload["answers"].get(step.key))
+        if error:
+            errors.append(f"{FIELD_LABELS.get(step.key, step.key)}: {error}")
+        else:
+            answers[step.key] = value
+    return answers, errors
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from aiogram.types import Update
+
+logger = logging.getLogger(__name__)
+
+MAX_TRACEBACK_CHARS = 4000
+APP_DIR = Path(__file__).resolve().parent.parent
+
+
+@dataclass(frozen=True, slots=True)
+class DeadLetter:
+    update_id: int
+    created_at: float
+    handler: str
+    error: str
+    state: str | None
+    data: dict[str, Any]
+    traceback: str
+    update: dict[str, Any]
+    bot_id: int | None = None
+    replayed: bool = False
+
+
+def _origin(exception: BaseException) -> str:
+    # ближайший к месту ошибки кадр внутри приложения, обычно это сам хэндлер
+    origin = "unknown"
+    for frame in traceback.extract_tb(exception.__traceback__):
+        if Path(frame.filename).resolve().is_relative_to(APP_DIR):
+            origin = f"{Path(frame.filename).stem}.{frame.name}"
+    return origin
+
+
+class DeadLetterStore:
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        # разобранный файл и его (mtime, размер): /deadletters и сводка не перечитывают неизменный файл
+        self._cache: tuple[tuple[int, int], list[DeadLetter]] | None = None
+
+    def _append(self, records: list[dict[str, Any]]) -> None:
+        lines = "".join(
+            json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str) + "\n" for record in records
+        )
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as file:
+                file.write(lines)
+
+    async def capture(
+        self,
+        bot_id: int,
+        update: Update,
+        exception: BaseException,
+        state: str | None,
+        data: dict[str, Any],
+    ) -> None:
+        tb = "".join(traceback.format_exception(exception))
+        record = {
+            "update_id": update.update_id,
+            "created_at": round(time.time(), 3),
+            "handler": _origin(exception),
+            "error": f"{exception.__class__.__name__}: {exception}",
+            "state": state,
+            "data": data,
+            "traceback": tb[-MAX_TRACEBACK_CHARS:],
+            "update": update.model_dump(mode="json", exclude_unset=True),
+            "bot_id": bot_id,
+        }
+        # запись на диск уходит в поток, чтобы обработка ошибок не блокировала event loop
+        await asyncio.to_thread(self._append, [record])
+
+    async def mark_replayed(self, update_ids: list[int]) -> None:
+        if update_ids:
+            await asyncio.to_thread(self._append, [{"replayed": update_id} for update_id in update_ids])
+
+    def _load_records(self) -> tuple[dict[int, dict[str, Any]], set[int]]:
+        # вызывается под self._lock
+        records: dict[int, dict[str, Any]] = {}
+        replayed: set[int] = set()
+        with self.path.open("r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if "replayed" in record:
+                    replayed.add(record["replayed"])
+                    continue
+                replayed.discard(record["update_id"])
+                records[record["update_id"]] = record
+        return records, replayed
+
+    def _read(self) -> list[DeadLetter]:
+        with self._lock:
+            try:
+                stat = self.path.stat()
+            except FileNotFoundError:
+                return []
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if self._cache is not None and self._cache[0] == signature:
+                return list(self._cache[1])
+
+            records, replayed = self._load_records()
+            entries = [
+                DeadLetter(**record, replayed=update_id in replayed) for update_id, record in records.items()
+            ]
+            self._cache = (signature, entries)
+            return list(entries)
+
+    async def list_entries(self) -> list[DeadLetter]:
+        return await asyncio.to_thread(self._read)
+
+    def _compact(self) -> int:
+        with self._lock:
+            if not self.path.exists():
+                return 0
+            records, replayed = self._load_records()
+            # переигранные ошибки больше не нужны, остальные переписываются по одной записи на update_id
+            kept = [record for update_id, record in records.items() if update_id not in replayed]
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with tmp_path.open("w", encoding="utf-8") as file:
+                for record in kept:
+                    file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.path)
+            self._cache = None
+            return len(records) - len(kept)
+
+    async def compact(self) -> None:
+        removed = await asyncio.to_thread(self._compact)
+        if removed:
+            logger.info("Dead letters: dropped %s replayed entries from %s", removed, self.path)
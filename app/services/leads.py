@@ -0,0 +1,5 @@
+# Формат записи заявки в leads.txt: его пишет menu.notify_admin, а читает сводка администраторам
+LEAD_DATE_PREFIX = "🕒 Дата: "
+LEAD_DATE_FORMAT = "%d.%m.%Y %H:%M"
+LEAD_BRAND_PREFIX = "🏷 Бренд: "
+LEAD_SEPARATOR = "-" * 40
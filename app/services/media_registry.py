@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from aiogram.types import FSInputFile, Message
+
+
+# file_id локальных файлов после первой загрузки; file_id действителен только для своего бота
+class MediaRegistry:
+    def __init__(self) -> None:
+        self._file_ids: dict[tuple[int, Path], str] = {}
+
+    def resolve(self, bot_id: int, source: str | Path) -> str | FSInputFile:
+        if not isinstance(source, Path):
+            return source
+
+        file_id = self._file_ids.get((bot_id, source))
+        if file_id is not None:
+            return file_id
+        if not source.exists():
+            raise FileNotFoundError(source)
+        return FSInputFile(source)
+
+    def remember_photos(self, bot_id: int, sources: tuple[str | Path, ...], messages: list[Message]) -> None:
+        for source, message in zip(sources, messages):
+            if isinstance(source, Path) and message.photo:
+                self._file_ids[(bot_id, source)] = message.photo[-1].file_id
+
+
+media_registry = MediaRegistry()
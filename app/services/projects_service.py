@@ -1,18 +1,206 @@
 import json
+import os
+import re
+import threading
+import zlib
+from bisect import bisect_left, bisect_right
 from pathlib import Path
 from typing import Any
 
-from app.data.projects import ProjectCatalogItem
+from app.config.brands import current_brand
+from app.data.projects import CatalogFacet, ProjectCatalogItem
 
-BASE_DIR = Path(__file__).resolve().parents[2]
-PROJECTS_PATH = BASE_DIR / "data" / "projects.json"
 PROJECT_REQUIRED_FIELDS = {"id", "title", "city", "size", "type", "description", "photos"}
 
+# разделители те же, что в _DIMENSIONS_RE, плюс пробел («8 4 1.5»); глубина и «м» в конце необязательны
+_SIZE_RE = re.compile(
+    r"^\s*(?P<l>\d+(?:[\.,]\d+)?)\s*(?:[xх*×]\s*|\s+)(?P<w>\d+(?:[\.,]\d+)?)"
+    r"(?:\s*(?:[xх*×]\s*|\s+)\d+(?:[\.,]\d+)?)?\s*(?:м\.?)?\s*$",
+    re.IGNORECASE,
+)
 
-def _ensure_storage_exists() -> None:
-    PROJECTS_PATH.parent.mkdir(parents=True, exist_ok=True)
-    if not PROJECTS_PATH.exists():
-        PROJECTS_PATH.write_text("[]", encoding="utf-8")
+
+def parse_project_size(size: str) -> tuple[float, float] | None:
+    """Длина и ширина из текстового размера проекта; длиной считается большая сторона."""
+    match = _SIZE_RE.match(size)
+    if not match:
+        return None
+    sides = float(match.group("l").replace(",", ".")), float(match.group("w").replace(",", "."))
+    if min(sides) <= 0:
+        return None
+    return max(sides), min(sides)
+
+
+def facet_token(value: str) -> str:
+    # короткий стабильный ключ для callback_data: город кириллицей легко упирается в лимит 64 байта,
+    # а регистр и лишние пробелы, набранные админом, не должны делить город на два
+    return format(zlib.crc32(" ".join(value.split()).casefold().encode()), "08x")
+
+
+class _Index:
+    """Вторичный индекс каталога: ключ → проекты в порядке каталога."""
+
+    __slots__ = ("buckets", "labels")
+
+    def __init__(self) -> None:
+        self.buckets: dict[str, dict[str, ProjectCatalogItem]] = {}
+        self.labels: dict[str, str] = {}
+
+    def add(self, key: str, label: str, project_id: str, item: ProjectCatalogItem) -> None:
+        self.buckets.setdefault(key, {})[project_id] = item
+        self.labels.setdefault(key, label)
+
+    def remove(self, key: str, project_id: str) -> None:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            return
+        bucket.pop(project_id, None)
+        if not bucket:
+            del self.buckets[key]
+            del self.labels[key]
+
+    def facets(self) -> list[CatalogFacet]:
+        return sorted(
+            (CatalogFacet(key, self.labels[key], len(bucket)) for key, bucket in self.buckets.items()),
+            key=lambda facet: facet.label.casefold(),
+        )
+
+
+class _RangeIndex:
+    """Проекты, отсортированные по числовому ключу: выборка диапазона — два bisect."""
+
+    __slots__ = ("keys", "items")
+
+    def __init__(self) -> None:
+        self.keys: list[float] = []
+        self.items: list[ProjectCatalogItem] = []
+
+    def add(self, key: float | None, item: ProjectCatalogItem) -> None:
+        if key is None:
+            return
+        position = bisect_right(self.keys, key)
+        self.keys.insert(position, key)
+        self.items.insert(position, item)
+
+    def remove(self, key: float | None, item: ProjectCatalogItem) -> None:
+        if key is None:
+            return
+        for position in range(bisect_left(self.keys, key), bisect_right(self.keys, key)):
+            if self.items[position] is item:
+                del self.keys[position]
+                del self.items[position]
+                return
+
+    def between(self, low: float | None, high: float | None) -> list[ProjectCatalogItem]:
+        # полуинтервал [low, high): соседние диапазоны не делят проект на границе
+        start = 0 if low is None else bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect_left(self.keys, high)
+        return self.items[start:end]
+
+    def reorder_ties(self, key: float | None, positions: dict[int, int]) -> None:
+        # проекты с равным ключом идут в порядке каталога, как при полной пересборке
+        if key is None:
+            return
+        start, end = bisect_left(self.keys, key), bisect_right(self.keys, key)
+        self.items[start:end] = sorted(self.items[start:end], key=lambda item: positions[id(item)])
+
+
+class _CatalogSnapshot:
+    __slots__ = ("signature", "items", "by_id", "by_city", "by_type", "by_city_type", "by_length", "by_area")
+
+    def __init__(self, signature: tuple[int, int] | None, items: tuple[ProjectCatalogItem, ...]):
+        self.signature = signature
+        self.items = items
+        self.by_id: dict[str, ProjectCatalogItem] = {}
+        self.by_city = _Index()
+        self.by_type = _Index()
+        # пара город+тип — чтобы выдача по двум фильтрам была одним обращением к словарю
+        self.by_city_type = _Index()
+        self.by_length = _RangeIndex()
+        self.by_area = _RangeIndex()
+        for item in items:
+            if _normalize_project_id(item.id) not in self.by_id:
+                self._index(item)
+
+    def _index(self, item: ProjectCatalogItem) -> None:
+        project_id = _normalize_project_id(item.id)
+        city, project_type = facet_token(item.city), facet_token(item.type)
+        self.by_id[project_id] = item
+        self.by_city.add(city, item.city, project_id, item)
+        self.by_type.add(project_type, item.type, project_id, item)
+        self.by_city_type.add(f"{city}:{project_type}", item.type, project_id, item)
+        self.by_length.add(item.length, item)
+        self.by_area.add(item.area, item)
+
+    def _unindex(self, item: ProjectCatalogItem) -> None:
+        project_id = _normalize_project_id(item.id)
+        city, project_type = facet_token(item.city), facet_token(item.type)
+        del self.by_id[project_id]
+        self.by_city.remove(city, project_id)
+        self.by_type.remove(project_type, project_id)
+        self.by_city_type.remove(f"{city}:{project_type}", project_id)
+        self.by_length.remove(item.length, item)
+        self.by_area.remove(item.area, item)
+
+    def apply(self, removed: ProjectCatalogItem | None, added: ProjectCatalogItem | None) -> bool:
+        """Переносит в снимок одно изменение; False — снимок разошёлся с файлом и его нужно пересобрать."""
+        items = list(self.items)
+        if removed is not None:
+            current = self.by_id.get(_normalize_project_id(removed.id))
+            if current is None:
+                return False
+            self._unindex(current)
+            position = items.index(current)
+            if added is not None:
+                items[position] = added
+            else:
+                del items[position]
+        elif added is not None:
+            if _normalize_project_id(added.id) in self.by_id:
+                return False
+            items.append(added)
+        if added is not None:
+            self._index(added)
+        self.items = tuple(items)
+        if removed is not None and added is not None:
+            self._reorder(added)
+        # дубли id в файле индекс не различает — такой каталог проще перечитать целиком
+        return len(self.by_id) == len(self.items)
+
+    def _reorder(self, item: ProjectCatalogItem) -> None:
+        # правка оставляет проект на его месте в каталоге, а _index добавил его в конец корзин:
+        # корзины выстраиваются по позиции в items, как при полной пересборке
+        positions = {id(entry): position for position, entry in enumerate(self.items)}
+        city, project_type = facet_token(item.city), facet_token(item.type)
+        for index, key in (
+            (self.by_city, city),
+            (self.by_type, project_type),
+            (self.by_city_type, f"{city}:{project_type}"),
+        ):
+            index.buckets[key] = dict(sorted(index.buckets[key].items(), key=lambda pair: positions[id(pair[1])]))
+        self.by_length.reorder_ties(item.length, positions)
+        self.by_area.reorder_ties(item.area, positions)
+
+
+# Разобранные каталоги по пути файла (бренды с общим файлом делят один снимок).
+# Снимок сверяется с mtime и размером файла; добавление, правка и удаление через сервис
+# переносятся в снимок и его индексы точечно, без перечитывания файла.
+_catalogs: dict[Path, _CatalogSnapshot] = {}
+# одна перезагрузка на всех: кто ждал блокировку, берёт уже загруженный снимок
+_catalog_lock = threading.Lock()
+
+
+def _projects_path() -> Path:
+    # у каждого бренда свой каталог
+    return current_brand().catalog_path
+
+
+def _ensure_storage_exists() -> Path:
+    projects_path = _projects_path()
+    projects_path.parent.mkdir(parents=True, exist_ok=True)
+    if not projects_path.exists():
+        projects_path.write_text("[]", encoding="utf-8")
+    return projects_path
 
 
 def _normalize_project_id(project_id: str | int) -> str:
@@ -24,14 +212,21 @@ def _sanitize_photos(photos: list[str] | tuple[str, ...] | None) -> list[str]:
 
 
 def _project_from_dict(raw_project: dict[str, Any]) -> ProjectCatalogItem:
+    size = str(raw_project["size"]).strip()
+    # размер разбирается один раз при сборке элемента, фильтры работают уже с числами
+    dimensions = parse_project_size(size)
+    length, width = dimensions or (None, None)
     return ProjectCatalogItem(
         id=raw_project["id"],
         title=str(raw_project["title"]).strip(),
         city=str(raw_project["city"]).strip(),
-        size=str(raw_project["size"]).strip(),
+        size=size,
         type=str(raw_project["type"]).strip(),
         description=str(raw_project["description"]).strip(),
         photos=tuple(_sanitize_photos(raw_project.get("photos"))),
+        length=length,
+        width=width,
+        area=round(length * width, 2) if dimensions else None,
     )
 
 
@@ -50,6 +245,32 @@ def _sanitize_project_payload(project: dict[str, Any]) -> dict[str, Any] | None:
     }
 
 
+def _file_signature(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _catalog() -> _CatalogSnapshot:
+    projects_path = _projects_path()
+    snapshot = _catalogs.get(projects_path)
+    if snapshot is not None and snapshot.signature == _file_signature(projects_path):
+        return snapshot
+
+    with _catalog_lock:
+        snapshot = _catalogs.get(projects_path)
+        if snapshot is not None and snapshot.signature == _file_signature(projects_path):
+            return snapshot
+
+        # load_projects может переписать файл при очистке, поэтому подпись снимается после загрузки
+        items = tuple(_project_from_dict(project) for project in load_projects())
+        snapshot = _CatalogSnapshot(_file_signature(projects_path), items)
+        _catalogs[projects_path] = snapshot
+        return snapshot
+
+
 def _find_project_index(payload: list[dict[str, Any]], project_id: str | int) -> int | None:
     normalized_id = _normalize_project_id(project_id)
     for index, item in enumerate(payload):
@@ -59,9 +280,9 @@ def _find_project_index(payload: list[dict[str, Any]], project_id: str | int) ->
 
 
 def load_projects() -> list[dict[str, Any]]:
-    _ensure_storage_exists()
+    projects_path = _ensure_storage_exists()
 
-    raw_content = PROJECTS_PATH.read_text(encoding="utf-8").strip()
+    raw_content = projects_path.read_text(encoding="utf-8").strip()
     if not raw_content:
         save_projects([])
         return []
@@ -91,22 +312,111 @@ def load_projects() -> list[dict[str, Any]]:
     return valid_projects
 
 
-def save_projects(data: list[dict[str, Any]]) -> None:
-    _ensure_storage_exists()
-    with PROJECTS_PATH.open("w", encoding="utf-8") as file:
+def _write_projects(projects_path: Path, data: list[dict[str, Any]]) -> None:
+    # пишем во временный файл и атомарно подменяем, чтобы прерванная запись не портила каталог
+    tmp_path = projects_path.with_suffix(".json.tmp")
+    with tmp_path.open("w", encoding="utf-8") as file:
         json.dump(data, file, ensure_ascii=False, indent=2)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, projects_path)
+
+
+def save_projects(data: list[dict[str, Any]]) -> None:
+    projects_path = _ensure_storage_exists()
+    _write_projects(projects_path, data)
+    _catalogs.pop(projects_path, None)
+
+
+def _save_change(
+    data: list[dict[str, Any]],
+    removed: ProjectCatalogItem | None,
+    added: ProjectCatalogItem | None,
+) -> None:
+    projects_path = _ensure_storage_exists()
+    with _catalog_lock:
+        snapshot = _catalogs.get(projects_path)
+        # снимок правится точечно, только если он соответствовал файлу до записи
+        in_sync = snapshot is not None and snapshot.signature == _file_signature(projects_path)
+        _write_projects(projects_path, data)
+        if in_sync and snapshot.apply(removed, added):
+            snapshot.signature = _file_signature(projects_path)
+        else:
+            _catalogs.pop(projects_path, None)
 
 
 def get_all_projects() -> tuple[ProjectCatalogItem, ...]:
-    return tuple(_project_from_dict(project) for project in load_projects())
+    return _catalog().items
 
 
 def get_project_by_id(id: str | int) -> ProjectCatalogItem | None:
-    normalized_id = _normalize_project_id(id)
-    for project in get_all_projects():
-        if _normalize_project_id(project.id) == normalized_id:
-            return project
-    return None
+    return _catalog().by_id.get(_normalize_project_id(id))
+
+
+def get_city_facets() -> list[CatalogFacet]:
+    return _catalog().by_city.facets()
+
+
+def get_type_facets(city: str | None = None) -> list[CatalogFacet]:
+    """Типы с числом проектов; city — токен города из facet_token, None — по всему каталогу."""
+    snapshot = _catalog()
+    if city is None:
+        return snapshot.by_type.facets()
+    return [
+        CatalogFacet(facet.token, facet.label, len(snapshot.by_city_type.buckets[f"{city}:{facet.token}"]))
+        for facet in snapshot.by_type.facets()
+        if f"{city}:{facet.token}" in snapshot.by_city_type.buckets
+    ]
+
+
+def get_city_label(city: str) -> str | None:
+    return _catalog().by_city.labels.get(city)
+
+
+def get_type_label(project_type: str) -> str | None:
+    return _catalog().by_type.labels.get(project_type)
+
+
+SizeRange = tuple[float | None, float | None]
+
+
+def filter_projects(
+    city: str | None = None,
+    project_type: str | None = None,
+    length: SizeRange | None = None,
+    area: SizeRange | None = None,
+) -> tuple[ProjectCatalogItem, ...]:
+    """Проекты по токенам города и типа (None — без фильтра) в порядке каталога.
+
+    length и area — полуинтервалы [от, до) в метрах и м², None — открытая граница; с ними выдача
+    берётся из отсортированного индекса и идёт по возрастанию, проекты без разобранного размера не попадают.
+    """
+    snapshot = _catalog()
+    if city is None and project_type is None:
+        bucket = None
+    elif city is None:
+        bucket = snapshot.by_type.buckets.get(project_type, {})
+    elif project_type is None:
+        bucket = snapshot.by_city.buckets.get(city, {})
+    else:
+        bucket = snapshot.by_city_type.buckets.get(f"{city}:{project_type}", {})
+
+    if length is None and area is None:
+        return snapshot.items if bucket is None else tuple(bucket.values())
+
+    if length is not None:
+        matches = snapshot.by_length.between(*length)
+        if area is not None:
+            low, high = area
+            matches = [
+                item for item in matches
+                if (low is None or item.area >= low) and (high is None or item.area < high)
+            ]
+    else:
+        matches = snapshot.by_area.between(*area)
+    if bucket is None:
+        return tuple(matches)
+    return tuple(item for item in matches if bucket.get(_normalize_project_id(item.id)) is item)
 
 
 def add_project(project: dict[str, Any]) -> ProjectCatalogItem:
@@ -129,8 +439,9 @@ def add_project(project: dict[str, Any]) -> ProjectCatalogItem:
         raise ValueError("Project payload is invalid")
 
     payload.append(new_project)
-    save_projects(payload)
-    return _project_from_dict(new_project)
+    item = _project_from_dict(new_project)
+    _save_change(payload, None, item)
+    return item
 
 
 def delete_project(id: str | int) -> ProjectCatalogItem | None:
@@ -139,9 +450,9 @@ def delete_project(id: str | int) -> ProjectCatalogItem | None:
     if project_index is None:
         return None
 
-    project = payload.pop(project_index)
-    save_projects(payload)
-    return _project_from_dict(project)
+    item = _project_from_dict(payload.pop(project_index))
+    _save_change(payload, item, None)
+    return item
 
 
 def update_project(id: str | int, data: dict[str, Any]) -> ProjectCatalogItem | None:
@@ -164,6 +475,8 @@ def update_project(id: str | int, data: dict[str, Any]) -> ProjectCatalogItem |
     if sanitized is None:
         return None
 
+    previous = _project_from_dict(payload[project_index])
     payload[project_index] = sanitized
-    save_projects(payload)
-    return _project_from_dict(sanitized)
+    item = _project_from_dict(sanitized)
+    _save_change(payload, previous, item)
+    return item
@@ -0,0 +1,28 @@
+import zlib
+from collections.abc import Sequence
+
+# Множественный выбор целиком живёт в callback_data: кнопка несёт текущую и новую битовую маску
+# вариантов и версию их списка, поэтому переключение не читает и не пишет FSM-хранилище.
+
+
+def selection_version(options: Sequence[str]) -> str:
+    # меняется при добавлении, удалении или перестановке вариантов — старые кнопки отбрасываются
+    return f"{zlib.crc32('|'.join(options).encode()) & 0xFFFF:x}"
+
+
+def to_mask(selected: Sequence[str], options: Sequence[str]) -> int:
+    return sum(1 << index for index, option in enumerate(options) if option in selected)
+
+
+def from_mask(mask: int, options: Sequence[str]) -> list[str]:
+    return [option for index, option in enumerate(options) if mask >> index & 1]
+
+
+def toggle_mask(mask: int, index: int, exclusive: int | None = None) -> int:
+    # exclusive — индекс варианта вроде «Не требуется», который снимает остальные и снимается ими
+    bit = 1 << index
+    if exclusive is None:
+        return mask ^ bit
+    if index == exclusive:
+        return 0 if mask & bit else bit
+    return (mask & ~(1 << exclusive)) ^ bit
@@ -0,0 +1,32 @@
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.stages: list[tuple[str, float]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - started))
+
+    def render(self) -> str:
+        lines = [f"  {name:<48} {duration * 1000:8.1f} ms" for name, duration in self.stages]
+        total = time.perf_counter() - self.started
+        lines.append(f"  {'total since process start':<48} {total * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+    def report(self) -> None:
+        logger.info("Startup timing:\n%s", self.render())
+
+
+startup_timer = StartupTimer()
@@ -1,41 +1,10 @@
 print("=== ЗАПУЩЕН НОВЫЙ MAIN.PY ===")
 
-import asyncio
+from app.utils.timing import startup_timer
 
-from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
-from aiogram.client.default import DefaultBotProperties
-
-from app.config import BOT_TOKEN
-from app.handlers.admin_projects import router as admin_projects_router
-from app.handlers.project_configurator import router as project_router
-from app.handlers.projects import router as projects_router
-from app.handlers.cost_handler import router as cost_router
-from app.handlers.menu import router as menu_router
-
-
-async def main() -> None:
-    bot = Bot(
-        token=BOT_TOKEN,
-        default=DefaultBotProperties(parse_mode="HTML")
-    )
-
-    dp = Dispatcher(storage=MemoryStorage())
-
-    # ✅ СНАЧАЛА конфигуратор
-    dp.include_router(project_router)
-    dp.include_router(projects_router)
-    dp.include_router(admin_projects_router)
-
-    # ✅ ПОТОМ общее меню (с fallback)
-    # ✅ ПОТОМ калькулятор предварительной стоимости
-    dp.include_router(cost_router)
-
-    # ✅ В конце общее меню (с fallback)
-    dp.include_router(menu_router)
-
-    await dp.start_polling(bot)
+with startup_timer.stage("import app.factory"):
+    from app.factory import run
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run()